@@ -1,12 +1,32 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 from experiments.experiment_runner import ExperimentRunner
+from models.black_litterman import BlackLitterman
 
 st.title("Hyperparameter Sensitivity Lab")
 
 tau = st.slider("Black-Litterman Tau", 0.01, 0.3, 0.05)
 esg_threshold = st.slider("Minimum ESG Score", 40, 80, 60)
 
+# Black-Litterman posterior over the whole tau range, evaluated from
+# one decomposition instead of re-running the pipeline per value
+returns = pd.read_csv("data/processed/returns.csv",
+                      index_col=0,
+                      parse_dates=True)
+
+n_assets = len(returns.columns)
+bl = BlackLitterman(returns.cov().values, np.ones(n_assets) / n_assets)
+
+taus = np.unique(np.append(np.linspace(0.01, 0.3, 30), tau))
+grid = bl.posterior_grid(np.eye(n_assets), returns.mean().values, taus)
+
+posterior = pd.DataFrame(grid[:, 0, 0, :], index=taus, columns=returns.columns)
+
+st.subheader("Posterior Expected Returns vs Tau")
+st.line_chart(posterior)
+st.write(posterior.loc[tau])
+
 if st.button("Run Experiment"):
 
     runner = ExperimentRunner()
@@ -1,6 +1,28 @@
 import pandas as pd
 import numpy as np
 
+def _strategy_blocks(weights, block_size):
+    """
+    Stack single schedules and blocks of schedules from ``weights``
+    into s x K x N blocks of at most ``block_size`` strategies.
+    """
+    if isinstance(weights, np.ndarray) and weights.ndim == 3:
+        for start in range(0, len(weights), block_size):
+            yield np.asarray(weights[start:start + block_size], dtype=float)
+        return
+
+    pending = []
+    for item in weights:
+        item = np.asarray(item, dtype=float)
+        pending.extend(item if item.ndim == 3 else [item])
+
+        while len(pending) >= block_size:
+            yield np.array(pending[:block_size])
+            pending = pending[block_size:]
+
+    if pending:
+        yield np.array(pending)
+
 class BacktestEngine:
 
     def __init__(self, returns):
@@ -11,6 +33,154 @@ class BacktestEngine:
         cumulative = (1 + portfolio_returns).cumprod()
         return cumulative
 
+    def run_schedule(self, weights, positions, horizon=None, drift=True):
+        """
+        Walk-forward backtest of a rebalance schedule in one pass.
+
+        weights is K x N, the target weights set at row positions[k] of
+        the returns panel. Each target is held from its row until the
+        next rebalance, for at most ``horizon`` rows if given. With
+        drift=True holdings drift with asset returns between
+        rebalances; with drift=False the targets are held every day.
+
+        Returns (portfolio_returns, holdings, turnover): daily returns,
+        the start-of-day weights behind them and, per rebalance, the
+        traded weight sum(|target - pre-trade weights|), where the first
+        rebalance trades from cash.
+        """
+        W = np.asarray(weights, dtype=float)
+        if W.size == 0:
+            # no rebalances, e.g. a history no longer than the window
+            W = W.reshape(0, self._panel().shape[1])
+
+        rows, period, offsets, lengths = self._schedule_rows(positions, horizon)
+        portfolio_returns, holdings, turnover = self._schedule_pass(
+            W, rows, period, offsets, lengths, drift
+        )
+
+        if isinstance(self.returns, pd.DataFrame):
+            index = self.returns.index[rows]
+            portfolio_returns = pd.Series(portfolio_returns, index=index)
+            holdings = pd.DataFrame(holdings, index=index,
+                                    columns=self.returns.columns)
+
+        return portfolio_returns, holdings, turnover
+
+    def _panel(self):
+        return np.asarray(getattr(self.returns, "values", self.returns), dtype=float)
+
+    def _schedule_rows(self, positions, horizon):
+        """
+        Panel row behind every output day of a schedule, with the
+        period of each day and each period's offset and length.
+        """
+        positions = np.asarray(positions)
+        T = len(self.returns)
+
+        stops = np.append(positions[1:], T)
+        if horizon is not None:
+            stops = np.minimum(stops, positions + horizon)
+        lengths = np.clip(np.minimum(stops, T) - positions, 0, None)
+
+        offsets = np.cumsum(lengths) - lengths
+        period = np.repeat(np.arange(len(positions)), lengths)
+        rows = np.arange(lengths.sum()) - np.repeat(offsets - positions, lengths)
+
+        return rows, period, offsets, lengths
+
+    @staticmethod
+    def _period_growth(R_held, period, offsets):
+        """
+        Growth of each asset from the start of its period to the start
+        of each day. Running sums of log|1 + r|, with counts of zero and
+        negative factors, restart at every period, so a -100% return
+        zeroes its asset for the rest of that period only.
+        """
+        factors = 1 + R_held
+        zero = factors == 0
+        logs = np.log(np.abs(np.where(zero, 1.0, factors)))
+
+        def before(x):
+            # sum over the earlier days of the same period
+            total = np.cumsum(x, axis=0) - x
+            return total - total[offsets][period]
+
+        sign = np.where(before((factors < 0).astype(float)) % 2, -1.0, 1.0)
+        return np.where(before(zero.astype(float)) > 0, 0.0,
+                        sign * np.exp(before(logs)))
+
+    def _schedule_pass(self, W, rows, period, offsets, lengths, drift):
+        """
+        Returns, holdings and turnover of ... x K x N target weights;
+        leading axes are independent strategies.
+        """
+        R_held = self._panel()[rows]
+
+        if drift:
+            growth = self._period_growth(R_held, period, offsets)
+            values = W[..., period, :] * growth
+            holdings = values / values.sum(axis=-1, keepdims=True)
+        else:
+            holdings = W[..., period, :]
+
+        portfolio_returns = np.einsum("...ti,ti->...t", holdings, R_held)
+
+        # weights just before each rebalance
+        last = offsets + lengths - 1
+        if drift:
+            closing = holdings[..., last, :] * (1 + R_held[last])
+            closing = closing / closing.sum(axis=-1, keepdims=True)
+        else:
+            closing = W
+        pre_trade = np.concatenate([np.zeros_like(W[..., :1, :]),
+                                    closing[..., :-1, :]], axis=-2)
+        turnover = np.abs(W - pre_trade).sum(axis=-1)
+
+        return portfolio_returns, holdings, turnover
+
+    def run_strategies(self, weights, positions=None, horizon=None,
+                       drift=True, block_size=32):
+        """
+        run_schedule for many strategies at once.
+
+        ``weights`` is S x K x N (target weights of S strategies at the
+        rows ``positions``), or S x T x N daily weights for every row of
+        the panel when ``positions`` is None. It may also be an
+        iterable of single schedules (K x N) or blocks of them
+        (s x K x N), e.g. a generator of variants. Strategies are run
+        ``block_size`` at a time, one einsum per block.
+
+        Returns (portfolio_returns, turnover): S x days and S x K
+        (S x T for daily weights, turnover from cash on the first day).
+        With a DataFrame panel the returns are a DataFrame with one
+        column per strategy.
+        """
+        if positions is None:
+            positions = np.arange(len(self.returns))
+            horizon = 1
+            drift = False
+
+        rows, period, offsets, lengths = self._schedule_rows(positions, horizon)
+
+        returns_blocks = []
+        turnover_blocks = []
+        for block in _strategy_blocks(weights, block_size):
+
+            block_returns, _, block_turnover = self._schedule_pass(
+                block, rows, period, offsets, lengths, drift
+            )
+            returns_blocks.append(block_returns)
+            turnover_blocks.append(block_turnover)
+
+        portfolio_returns = np.concatenate(returns_blocks)
+        turnover = np.concatenate(turnover_blocks)
+
+        if isinstance(self.returns, pd.DataFrame):
+            portfolio_returns = pd.DataFrame(portfolio_returns.T,
+                                             index=self.returns.index[rows])
+
+        return portfolio_returns, turnover
+
     def sharpe_ratio(self, portfolio_returns, rf=0):
         excess = portfolio_returns - rf
         return np.sqrt(252) * excess.mean() / excess.std()
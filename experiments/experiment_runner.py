@@ -1,9 +1,13 @@
+import numpy as np
 import pandas as pd
 from utils.config_loader import load_config
 from utils.seed_control import set_global_seed
 from validation.rolling_regime_model import RollingRegimeModel
 from reporting.performance_report import PerformanceReport
 from models.transaction_cost import TransactionCostModel
+from models.garch_cache import GarchParameterCache
+from models.recursive_covariance import EWMACovariance, DCCCovariance
+from utils.executor import TaskExecutor
 
 class ExperimentRunner:
 
@@ -20,30 +24,72 @@ class ExperimentRunner:
         esg = pd.read_csv("data/raw/esg_scores.csv",
                           index_col=0)
 
+        garch_cache = GarchParameterCache(
+            self.config["risk"]["garch_cache_dir"],
+            warm_start=self.config["risk"]["garch_warm_start"]
+        )
+
+        risk = self.config["risk"]
+        cov_filter = None
+        if risk["cov_mode"] == "ewma":
+            cov_filter = EWMACovariance(risk["ewma_lambda"])
+        elif risk["cov_mode"] == "dcc":
+            cov_filter = DCCCovariance(risk["dcc_a"], risk["dcc_b"], risk["ewma_lambda"])
+
         model = RollingRegimeModel(
             returns,
             esg,
             window=self.config["data"]["window"],
-            rebalance=self.config["data"]["rebalance"]
+            rebalance=self.config["data"]["rebalance"],
+            risk_options={
+                "garch_backend": self.config["risk"]["garch_backend"],
+                "param_cache": garch_cache,
+                "executor": TaskExecutor.from_config(self.config),
+                "cov_mode": risk["cov_mode"],
+                "cov_filter": cov_filter
+            }
         )
 
         portfolio_returns, weights = model.run()
 
-        # Apply transaction cost
-        tc_model = TransactionCostModel()
-        adjusted_returns = tc_model.apply_costs(
-            portfolio_returns,
-            weights,
-            self.config["transaction_cost"]["cost_per_turnover"]
-        )
+        # Apply transaction cost on the first day held after each
+        # rebalance; every holding period but the last is `rebalance` days
+        tc_model = self.cost_model(returns, len(weights))
+        starts = np.arange(len(weights)) * self.config["data"]["rebalance"]
+        adjusted_returns = tc_model.apply_costs(portfolio_returns, weights, starts)
 
         report = PerformanceReport(adjusted_returns)
         summary = report.summary()
+        summary.update(garch_cache.summary())
+        summary.update(model.optimizer.summary())
 
         self.log_results(summary)
 
         return summary
 
+    def cost_model(self, returns, n_rebalances):
+        """
+        TransactionCostModel from the config, with the trailing daily
+        vol at each rebalance for the impact term.
+        """
+        costs = self.config["transaction_cost"]
+        data = self.config["data"]
+
+        adv = None
+        if costs.get("adv_path"):
+            adv = pd.read_csv(costs["adv_path"], index_col=0).iloc[:, 0]
+            adv = adv.reindex(returns.columns).values
+
+        ends = np.arange(data["window"], len(returns), data["rebalance"])[:n_rebalances]
+        volatility = returns.rolling(costs.get("vol_window", 63)).std().values[ends - 1]
+
+        return TransactionCostModel(cost_per_turnover=costs["cost_per_turnover"],
+                                    spread=costs.get("spread", 0.0),
+                                    impact=costs.get("impact", 0.0),
+                                    adv=adv,
+                                    volatility=volatility,
+                                    portfolio_value=costs.get("portfolio_value", 1.0))
+
     def log_results(self, results):
 
         log_path = "results/experiment_logs.csv"
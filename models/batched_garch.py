@@ -0,0 +1,327 @@
+import numpy as np
+
+class BatchedGARCH:
+    """
+    Constant-mean GARCH(1,1) with normal errors, fitted to every column
+    of a (T, N) returns array at once.
+
+    Mirrors ``arch_model(y, vol="Garch", p=1, q=1)``: returns are scaled
+    by ``scale`` before fitting, the recursion starts from the same EWMA
+    backcast and starting values come from the same grid search. Each
+    asset takes its own projected Newton steps, but every pass of the
+    variance recursion is a vector operation across all assets still
+    being optimized.
+
+    Parameters are stored per asset as [mu, omega, alpha, beta].
+    Columns with (next to) no variance, e.g. a suspended name, have no
+    GARCH fit: their parameters and forecasts are NaN.
+    """
+
+    BACKCAST_WEIGHTS = 0.94 ** np.arange(75)
+    MAX_PERSISTENCE = 1.0
+    # sample variance (in scaled units) below which a column is not fitted
+    MIN_VARIANCE = 1e-12
+
+    def __init__(self, returns, scale=100.0):
+        self.returns = np.asarray(returns, dtype=float)
+        if self.returns.ndim == 1:
+            self.returns = self.returns[:, None]
+        self.y = self.returns * scale
+        self.scale = scale
+        self.n_obs, self.n_assets = self.y.shape
+        self.params = None
+
+        resids = self.y - self.y.mean(axis=0)
+        tau = min(75, self.n_obs)
+        w = self.BACKCAST_WEIGHTS[:tau] / self.BACKCAST_WEIGHTS[:tau].sum()
+
+        self.backcast = w @ resids[:tau] ** 2
+        self.floor = np.var(resids, axis=0) / 1e8
+        self.degenerate = np.var(resids, axis=0) < self.MIN_VARIANCE
+        self.omega_bounds = (1e-8 * np.mean(resids ** 2, axis=0),
+                             10 * np.mean(resids ** 2, axis=0))
+
+    # -----------------------------
+    # 1. RECURSION AND LIKELIHOOD
+    # -----------------------------
+    def _variance(self, params, cols):
+        mu, omega, alpha, beta = params
+        resids = self.y[:, cols] - mu
+
+        # sigma2[t] = drive[t] + beta * sigma2[t-1], with the backcast
+        # standing in for both lagged terms at t = 0
+        sigma2 = np.empty_like(resids)
+        sigma2[0] = omega + (alpha + beta) * self.backcast[cols]
+        sigma2[1:] = omega + alpha * resids[:-1] ** 2
+        self._recurse(sigma2, beta)
+
+        return resids, np.maximum(sigma2, self.floor[cols])
+
+    @staticmethod
+    def _recurse(x, beta):
+        """
+        In-place x[t] += beta * x[t-1] along the time axis.
+        """
+        carry = np.empty_like(x[0])
+        for t in range(1, len(x)):
+            np.multiply(beta, x[t-1], out=carry)
+            x[t] += carry
+
+    def loglikelihood(self, params, cols=slice(None)):
+        """
+        Gaussian log-likelihood per asset for a (4, n) parameter block.
+        """
+        resids, sigma2 = self._variance(params, cols)
+        return -0.5 * np.sum(np.log(2 * np.pi) + np.log(sigma2)
+                             + resids ** 2 / sigma2, axis=0)
+
+    def _gradient(self, params, cols):
+        """
+        Gradient of the log-likelihood with respect to
+        [mu, omega, alpha, beta], shape (4, n).
+        """
+        mu, omega, alpha, beta = params
+        resids, sigma2 = self._variance(params, cols)
+        backcast = self.backcast[cols]
+
+        # d sigma2[t] / d theta follows the same beta recursion
+        deriv = np.empty((self.n_obs, 4, resids.shape[1]))
+        deriv[0] = [np.zeros_like(mu), np.ones_like(mu), backcast, backcast]
+        deriv[1:, 0] = -2 * alpha * resids[:-1]
+        deriv[1:, 1] = 1.0
+        deriv[1:, 2] = resids[:-1] ** 2
+        deriv[1:, 3] = sigma2[:-1]
+        self._recurse(deriv, beta)
+
+        dl_ds = 0.5 * (resids ** 2 / sigma2 - 1) / sigma2
+
+        grad = np.einsum("tkn,tn->kn", deriv, dl_ds)
+        grad[0] += np.sum(resids / sigma2, axis=0)
+
+        return grad
+
+    # -----------------------------
+    # 2. BOX PARAMETRIZATION
+    # -----------------------------
+    # The optimizer works on x = [mu, omega, persistence, alpha share],
+    # which turns alpha, beta >= 0 and alpha + beta < 1 into box bounds.
+    @staticmethod
+    def _natural(x):
+        mu, omega, persistence, share = x
+        return np.array([mu, omega, persistence * share,
+                         persistence * (1 - share)])
+
+    @staticmethod
+    def _box(params):
+        mu, omega, alpha, beta = params
+        persistence = alpha + beta
+        share = np.divide(alpha, persistence,
+                          out=np.full_like(alpha, 0.5),
+                          where=persistence > 0)
+        return np.array([mu, omega, persistence, share])
+
+    def _bounds(self, cols):
+        lower, upper = self.omega_bounds
+        n = len(lower[cols])
+        return (np.array([np.full(n, -np.inf), lower[cols],
+                          np.zeros(n), np.zeros(n)]),
+                np.array([np.full(n, np.inf), upper[cols],
+                          np.full(n, self.MAX_PERSISTENCE), np.ones(n)]))
+
+    def _box_gradient(self, x, cols):
+        """
+        Log-likelihood gradient in the box coordinates, shape (4, n).
+        """
+        grad = self._gradient(self._natural(x), cols)
+        persistence, share = x[2], x[3]
+        d_alpha, d_beta = grad[2].copy(), grad[3].copy()
+
+        grad[2] = share * d_alpha + (1 - share) * d_beta
+        grad[3] = persistence * (d_alpha - d_beta)
+        return grad
+
+    def _box_hessian(self, x, cols, grad):
+        """
+        Forward-difference Hessian of the box gradient, shape (n, 4, 4).
+        All four perturbations go through one stacked recursion.
+        """
+        n = x.shape[1]
+        step = 1e-6 * (np.abs(x) + 1e-4)
+
+        shifted = np.tile(x, 4)
+        for k in range(4):
+            shifted[k, k*n:(k+1)*n] += step[k]
+
+        shifted_grad = self._box_gradient(shifted, np.tile(cols, 4))
+        hessian = np.stack([(shifted_grad[:, k*n:(k+1)*n] - grad) / step[k]
+                            for k in range(4)], axis=2).transpose(1, 0, 2)
+
+        return 0.5 * (hessian + hessian.transpose(0, 2, 1))
+
+    # -----------------------------
+    # 3. STARTING VALUES
+    # -----------------------------
+    def starting_values(self):
+        """
+        Best point of arch's GARCH starting-value grid, per asset,
+        shape (4, N).
+        """
+        target = np.mean((self.y - self.y.mean(axis=0)) ** 2, axis=0)
+        best_llf = np.full(self.n_assets, -np.inf)
+        best = np.zeros((4, self.n_assets))
+
+        for alpha in [0.01, 0.05, 0.1, 0.2]:
+            for persistence in [0.5, 0.7, 0.9, 0.98]:
+                sv = np.array([
+                    self.y.mean(axis=0),
+                    (1 - persistence) * target,
+                    np.full(self.n_assets, alpha),
+                    np.full(self.n_assets, persistence - alpha)
+                ])
+                llf = self.loglikelihood(sv)
+
+                better = llf > best_llf
+                best[:, better] = sv[:, better]
+                best_llf[better] = llf[better]
+
+        return best
+
+    # -----------------------------
+    # 4. FIT AND FORECAST
+    # -----------------------------
+    def fit(self, starting_values=None, tol=1e-8, maxiter=200):
+        """
+        Estimate all assets. ``starting_values`` is an optional (N, 4)
+        array of [mu, omega, alpha, beta], e.g. the previous window's
+        estimates; rows containing NaN fall back to the grid search.
+
+        Each asset takes projected Newton steps on its own 4x4
+        finite-difference Hessian, with coordinates pinned at a bound held
+        fixed, and stops once its Newton decrement or its last gain in
+        log-likelihood falls below ``tol``, or no step along its
+        direction improves the likelihood.
+        """
+        if self.degenerate.any():
+            return self._fit_valid(starting_values, tol, maxiter)
+
+        everything = np.arange(self.n_assets)
+        lower, upper = self._bounds(everything)
+
+        if starting_values is None:
+            params = self.starting_values()
+        else:
+            params = np.asarray(starting_values, dtype=float).T
+            unset = np.isnan(params).any(axis=0)
+            if unset.any():
+                params = np.where(unset, self.starting_values(), params)
+        x = np.clip(self._box(params), lower, upper)
+
+        llf = self.loglikelihood(self._natural(x))
+        active = everything.copy()
+
+        for iteration in range(maxiter):
+
+            xa = x[:, active]
+            grad = self._box_gradient(xa, active)
+
+            # coordinates on or within eps of a bound that point outwards
+            # are snapped to the bound and held there for this step
+            lo, hi = lower[:, active], upper[:, active]
+            eps = np.array([np.zeros(len(active)), 10 * lo[1],
+                            np.full(len(active), 1e-6),
+                            np.full(len(active), 1e-6)])
+            at_lower = (xa - lo <= eps) & (grad < 0)
+            at_upper = (hi - xa <= eps) & (grad > 0)
+            pinned = (at_lower | at_upper).T
+            free = ~pinned
+
+            # Newton step on the free block, with the negative Hessian's
+            # eigenvalues floored so the direction is always an ascent one
+            curvature = -self._box_hessian(xa, active, grad)
+            curvature *= free[:, :, None] & free[:, None, :]
+            values, vectors = np.linalg.eigh(curvature)
+            floor = 1e-8 * np.abs(values).max(axis=1, keepdims=True) + 1e-12
+            values = np.maximum(values, floor)
+
+            g = np.where(free, grad.T, 0.0)
+            step = np.einsum("nij,nj,nkj,nk->ni", vectors, 1 / values, vectors, g)
+            step = np.where(free, step, 0.0)
+            decrement = np.einsum("ni,ni->n", g, step)
+
+            snapped = np.where(at_lower, lo, np.where(at_upper, hi, xa))
+            moved = (snapped != xa).any(axis=0)
+
+            keep = (decrement > tol) | moved
+            active, step, decrement = active[keep], step[keep].T, decrement[keep]
+            snapped, free = snapped[:, keep], free[keep].T
+
+            # backtracking, one likelihood pass per trial length
+            pending = np.ones(len(active), dtype=bool)
+            gain = np.zeros(len(active))
+            length = 1.0
+            while pending.any() and length > 1e-10:
+                cols = active[pending]
+                trial = np.where(free[:, pending],
+                                 x[:, cols] + length * step[:, pending],
+                                 snapped[:, pending])
+                trial = np.clip(trial, lower[:, cols], upper[:, cols])
+                trial_llf = self.loglikelihood(self._natural(trial), cols)
+
+                accept = trial_llf >= llf[cols] + 1e-4 * length * decrement[pending]
+                gain[np.flatnonzero(pending)[accept]] = trial_llf[accept] - llf[cols[accept]]
+                x[:, cols[accept]] = trial[:, accept]
+                llf[cols[accept]] = trial_llf[accept]
+
+                pending[np.flatnonzero(pending)[accept]] = False
+                length *= 0.5
+
+            # assets that cannot improve, or only by less than tol,
+            # have converged
+            active = active[~pending & (gain > tol)]
+
+            if len(active) == 0:
+                break
+
+        self.iterations = iteration + 1
+        self.loglikelihoods = llf
+        self.params = self._natural(x).T
+
+        return self
+
+    def _fit_valid(self, starting_values, tol, maxiter):
+        """
+        fit() on the columns with variance only; the degenerate ones
+        get NaN parameters.
+        """
+        valid = ~self.degenerate
+        if starting_values is not None:
+            starting_values = np.asarray(starting_values, dtype=float)[valid]
+
+        garch = BatchedGARCH(self.returns[:, valid], self.scale)
+        if valid.any():
+            garch.fit(starting_values, tol, maxiter)
+
+        self.iterations = getattr(garch, "iterations", 0)
+        self.loglikelihoods = np.full(self.n_assets, np.nan)
+        self.params = np.full((self.n_assets, 4), np.nan)
+        if valid.any():
+            self.loglikelihoods[valid] = garch.loglikelihoods
+            self.params[valid] = garch.params
+
+        return self
+
+    def forecast_variance(self):
+        """
+        One-step-ahead conditional variance in scaled units, shape (N,).
+        """
+        params = self.params.T
+        _, omega, alpha, beta = params
+        resids, sigma2 = self._variance(params, slice(None))
+
+        return omega + alpha * resids[-1] ** 2 + beta * sigma2[-1]
+
+    def forecast_vol(self):
+        """
+        One-step-ahead volatility in return units, shape (N,).
+        """
+        return np.sqrt(self.forecast_variance()) / self.scale
@@ -1,5 +1,5 @@
-import numpy as np
-import pandas as pd
+from models.black_litterman import (black_litterman_posteriors,
+                                    black_litterman_posterior_grid)
 
 class BlackLittermanDynamic:
 
@@ -13,16 +13,18 @@ class BlackLittermanDynamic:
 
     def posterior(self, P, Q, tau=0.05):
 
-        pi = self.implied_returns()
-        omega = np.diag(np.diag(P @ (tau*self.cov) @ P.T))
+        mu_bl = black_litterman_posteriors(self.cov, self.market_weights,
+                                           P, Q, tau=tau, delta=self.delta)
 
-        middle = np.linalg.inv(
-            np.linalg.inv(tau*self.cov) + P.T @ np.linalg.inv(omega) @ P
-        )
+        return mu_bl
 
-        mu_bl = middle @ (
-            np.linalg.inv(tau*self.cov) @ pi +
-            P.T @ np.linalg.inv(omega) @ Q
-        )
+    def posterior_grid(self, P, Q, taus, deltas=None, omega_scales=(1.0,)):
+        """
+        posterior over a grid of tau, delta and omega scalings,
+        shape (len(taus), len(deltas), len(omega_scales), N)
+        """
+        if deltas is None:
+            deltas = [self.delta]
 
-        return mu_bl
+        return black_litterman_posterior_grid(self.cov, self.market_weights,
+                                              P, Q, taus, deltas, omega_scales)
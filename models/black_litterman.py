@@ -1,6 +1,93 @@
 import numpy as np
 import pandas as pd
 
+def black_litterman_posteriors(covs, market_weights, P, Q, tau=0.05,
+                               delta=2.5, omega=None):
+    """
+    Posterior expected returns for a stack of covariances in one call.
+
+    covs is W x N x N (or N x N); P, Q and omega may be shared or given
+    per covariance (W x K x N, W x K, W x K x K). Uses the view-space
+    form
+
+        pi + tau S P' (P tau S P' + omega)^-1 (Q - P pi)
+
+    so only the K x K view matrices are factorized (one batched solve)
+    and S itself is never inverted. Omega defaults to the diagonal of
+    P tau S P'. A single structured covariance such as FactorCovariance
+    also works, since only products with S are needed.
+    """
+    if isinstance(covs, (np.ndarray, pd.DataFrame, list)):
+        covs = np.asarray(covs, dtype=float)
+
+    P = np.asarray(P, dtype=float)
+    Q = np.asarray(Q, dtype=float)
+    Pt = np.swapaxes(P, -1, -2)
+
+    pi = delta * (covs @ market_weights)
+    tau_cov_Pt = tau * (covs @ Pt)
+    view_cov = P @ tau_cov_Pt
+
+    if omega is None:
+        omega = np.diagonal(view_cov, axis1=-2, axis2=-1)[..., None] * np.eye(view_cov.shape[-1])
+
+    surprise = Q - np.einsum("...kn,...n->...k", P, pi)
+    adjustment = np.linalg.solve(view_cov + omega, surprise[..., None])
+
+    return pi + (tau_cov_Pt @ adjustment)[..., 0]
+
+def black_litterman_posterior_grid(cov, market_weights, P, Q, taus,
+                                   deltas=(2.5,), omega_scales=(1.0,),
+                                   omega=None):
+    """
+    Posterior expected returns over a tau x delta x omega-scale grid,
+    returned as an array of shape (len(taus), len(deltas),
+    len(omega_scales), N).
+
+    With A = P S P' and G the base view uncertainty (omega, or the
+    diagonal of A when omega is None, which makes Omega proportional to
+    tau as in posterior_returns), one eigen-decomposition
+
+        G^-1/2 A G^-1/2 = V diag(lam) V'
+
+    turns every (P tau S P' + s G)^-1 into V diag(1/(tau lam + s)) V'
+    in the rotated basis, so each grid point costs O(N*K) and the whole
+    surface costs about one posterior.
+    """
+    cov = np.asarray(cov, dtype=float)
+    P = np.asarray(P, dtype=float)
+    Q = np.asarray(Q, dtype=float)
+
+    taus = np.asarray(taus, dtype=float)[:, None, None, None]
+    deltas = np.asarray(deltas, dtype=float)[None, :, None, None]
+    scales = np.asarray(omega_scales, dtype=float)[None, None, :, None]
+
+    cov_Pt = cov @ P.T
+    A = P @ cov_Pt
+
+    if omega is None:
+        G = np.diag(np.diag(A))
+        s = scales * taus
+    else:
+        G = np.asarray(omega, dtype=float)
+        s = scales
+
+    g_vals, g_vecs = np.linalg.eigh(G)
+    G_inv_sqrt = (g_vecs / np.sqrt(g_vals)) @ g_vecs.T
+
+    lam, V = np.linalg.eigh(G_inv_sqrt @ A @ G_inv_sqrt)
+    rotation = G_inv_sqrt @ V
+
+    cov_w = cov @ market_weights
+    H = cov_Pt @ rotation
+    q = rotation.T @ Q
+    r = rotation.T @ (P @ cov_w)
+
+    # posterior = delta S w + tau H [(q - delta r) / (tau lam + s)]
+    weights = taus * (q - deltas * r) / (taus * lam + s)
+
+    return deltas * cov_w + weights @ H.T
+
 class BlackLitterman:
 
     def __init__(self, cov, market_weights, delta=2.5):
@@ -12,18 +99,18 @@ class BlackLitterman:
         return self.delta * self.cov @ self.market_weights
 
     def posterior_returns(self, P, Q, tau=0.05, omega=None):
-        pi = self.implied_equilibrium_returns()
-
-        if omega is None:
-            omega = np.diag(np.diag(P @ (tau*self.cov) @ P.T))
-
-        middle = np.linalg.inv(
-            np.linalg.inv(tau*self.cov) + P.T @ np.linalg.inv(omega) @ P
-        )
+        return black_litterman_posteriors(self.cov, self.market_weights, P, Q,
+                                          tau=tau, delta=self.delta, omega=omega)
 
-        posterior = middle @ (
-            np.linalg.inv(tau*self.cov) @ pi +
-            P.T @ np.linalg.inv(omega) @ Q
-        )
+    def posterior_grid(self, P, Q, taus, deltas=None, omega_scales=(1.0,),
+                       omega=None):
+        """
+        posterior_returns over a grid of tau, delta and omega scalings,
+        shape (len(taus), len(deltas), len(omega_scales), N)
+        """
+        if deltas is None:
+            deltas = [self.delta]
 
-        return posterior
+        return black_litterman_posterior_grid(self.cov, self.market_weights,
+                                              P, Q, taus, deltas,
+                                              omega_scales, omega)
@@ -1,21 +1,161 @@
 import numpy as np
 import pandas as pd
 from arch import arch_model
-from sklearn.covariance import LedoitWolf
+from models.shrinkage import ledoit_wolf_batch
+from models.batched_garch import BatchedGARCH
+from models.recursive_covariance import EWMACovariance, DCCCovariance
+from utils.executor import TaskExecutor
+
+GARCH_BACKENDS = ("arch", "batched")
+COV_MODES = ("garch", "ewma", "dcc")
+
+def _fit_arch(task):
+    """
+    Fit one asset's GARCH(1,1) with arch and return its parameters.
+    Module level so that it can be sent to worker processes.
+    """
+    series, starting_values = task
+    model = arch_model(series * 100, vol="Garch", p=1, q=1)
+    res = model.fit(disp="off", starting_values=starting_values)
+    return res.params.values
+
+def window_covariance(task):
+    """
+    Dynamic covariance of one rebalance window from (WalkForwardScheduler,
+    rebalance number, Ledoit-Wolf covariance, DynamicRiskEngine options).
+    In a worker process it also returns the hits, misses and refit
+    seconds its copy of the param_cache added, else None.
+    Module level so that it can be sent to worker processes.
+    """
+    schedule, k, lw_cov, risk_options = task
+    engine = DynamicRiskEngine(schedule.train_frame(k),
+                               shrunk_cov=lw_cov,
+                               **risk_options)
+
+    cache = risk_options.get("param_cache")
+    if cache is None or not cache.is_copy():
+        return engine.dynamic_covariance().values, None
+
+    before = cache.stats()
+    cov = engine.dynamic_covariance().values
+    return cov, tuple(after - start for after, start in zip(cache.stats(), before))
+
+def window_covariances(schedule, executor, lw_covs, risk_options, windows=None):
+    """
+    window_covariance for every rebalance in ``windows`` (default all),
+    run through ``executor``. Process-pool workers fill their own copy
+    of the param_cache, so their counts are added to the caller's here.
+    """
+    results = schedule.map_windows(executor, window_covariance, lw_covs,
+                                   [risk_options] * len(lw_covs), windows=windows)
+
+    for _, stats in results:
+        if stats is not None:
+            risk_options["param_cache"].merge_stats(*stats)
+
+    return [cov for cov, _ in results]
+
+def check_window_independent(risk_options):
+    """
+    Raise if ``risk_options`` carry state from one rebalance to the
+    next (a streaming cov_filter, or GARCH warm starts), which would
+    make parallel results depend on how dates are split over workers,
+    or bootstrap results on the order of the paths.
+    """
+    if risk_options.get("cov_filter") is not None:
+        raise ValueError("A shared cov_filter streams across dates, so results "
+                         "would depend on task order; let each window build its own")
+
+    cache = risk_options.get("param_cache")
+    if cache is not None and cache.warm_start:
+        raise ValueError("GARCH warm starts chain fits across dates, so results "
+                         "would depend on task order; use warm_start=False")
+
+def check_checkpointable(risk_options):
+    """
+    Raise if ``risk_options`` hold a shared cov_filter: its state at the
+    first recomputed date is not checkpointed, so a resumed run would
+    restart the filter there and differ from a fresh one.
+    """
+    if risk_options.get("cov_filter") is not None:
+        raise ValueError("A shared cov_filter streams across dates and cannot "
+                         "resume from checkpoints; let each window build its own")
 
 class DynamicRiskEngine:
 
-    def __init__(self, returns):
+    def __init__(self, returns, shrunk_cov=None, garch_backend="arch",
+                 param_cache=None, executor=None, cov_mode="garch",
+                 cov_filter=None):
+        if garch_backend not in GARCH_BACKENDS:
+            raise ValueError(f"Unknown GARCH backend: {garch_backend}")
+        if cov_mode not in COV_MODES:
+            raise ValueError(f"Unknown covariance mode: {cov_mode}")
+
         self.returns = returns
+        # Ledoit-Wolf covariance of `returns`, if the caller already has it
+        self.shrunk_cov = shrunk_cov
+        # "arch" fits one arch_model per asset, "batched" fits all
+        # assets at once with BatchedGARCH
+        self.garch_backend = garch_backend
+        # GarchParameterCache for warm starts and reuse of earlier fits
+        self.param_cache = param_cache
+        # TaskExecutor for the per-asset arch fits
+        self.executor = executor or TaskExecutor()
+        # "garch" combines GARCH vols with the shrunk correlation;
+        # "ewma" and "dcc" use a recursive filter instead. Passing the
+        # same cov_filter to every rebalance lets it stream the new days
+        # only, rather than re-estimating the whole window.
+        self.cov_mode = cov_mode
+        if cov_filter is None and cov_mode == "ewma":
+            cov_filter = EWMACovariance()
+        elif cov_filter is None and cov_mode == "dcc":
+            cov_filter = DCCCovariance()
+        self.cov_filter = cov_filter
 
     # -----------------------------
     # 1. UNIVARIATE GARCH VOL
     # -----------------------------
-    def forecast_garch_vol(self, asset):
+    def garch_params(self, assets):
+        """
+        arch GARCH(1,1) parameters for ``assets``, taken from the cache
+        where possible and fitted through the executor otherwise.
+        """
+        cache = self.param_cache
+        params = {}
+        keys = {}
+        to_fit = []
+
+        for asset in assets:
+            if cache is not None:
+                keys[asset] = cache.key(asset, self.returns[asset], "arch")
+                params[asset] = cache.get(asset, keys[asset])
+
+            if params.get(asset) is None:
+                to_fit.append(asset)
+
+        if cache is None:
+            tasks = [(self.returns[asset], None) for asset in to_fit]
+            fitted = self.executor.map(_fit_arch, tasks)
+        else:
+            tasks = [(self.returns[asset], cache.previous(asset)) for asset in to_fit]
+            with cache.timed():
+                fitted = self.executor.map(_fit_arch, tasks)
+
+        for asset, values in zip(to_fit, fitted):
+            params[asset] = values
+            if cache is not None:
+                cache.put(asset, keys[asset], values)
+
+        return params
+
+    def forecast_garch_vol(self, asset, params=None):
+
+        if params is None:
+            params = self.garch_params([asset])[asset]
 
         series = self.returns[asset] * 100
         model = arch_model(series, vol="Garch", p=1, q=1)
-        res = model.fit(disp="off")
+        res = model.fix(params)
 
         forecast = res.forecast(horizon=1)
         variance = forecast.variance.iloc[-1, 0]
@@ -27,20 +167,80 @@ class DynamicRiskEngine:
     # -----------------------------
     def forecast_all_vols(self):
 
+        if self.garch_backend == "batched":
+            return self.forecast_batched_vols()
+
+        params = self.garch_params(self.returns.columns)
+
         vols = {}
         for asset in self.returns.columns:
-            vols[asset] = self.forecast_garch_vol(asset)
+            vols[asset] = self.forecast_garch_vol(asset, params[asset])
 
         return pd.Series(vols)
 
+    def forecast_batched_vols(self):
+        """
+        One-day vols from BatchedGARCH. Assets whose fit is NaN
+        (zero-variance columns, e.g. a suspended stock) get their
+        Ledoit-Wolf sample volatility instead, which the shrinkage keeps
+        positive so the covariance stays invertible.
+        """
+        garch = BatchedGARCH(self.returns.values)
+        cache = self.param_cache
+
+        if cache is None:
+            garch.fit()
+            return self._sample_vol_fallback(garch.forecast_vol())
+
+        assets = self.returns.columns
+        keys = [cache.key(asset, self.returns[asset], "batched") for asset in assets]
+
+        params = np.full((len(assets), 4), np.nan)
+        starts = np.full((len(assets), 4), np.nan)
+        missing = []
+
+        for j, asset in enumerate(assets):
+            cached = cache.get(asset, keys[j])
+            if cached is not None:
+                params[j] = cached
+            else:
+                missing.append(j)
+                if cache.previous(asset) is not None:
+                    starts[j] = cache.previous(asset)
+
+        if missing:
+            with cache.timed():
+                fitted = BatchedGARCH(self.returns.values[:, missing]).fit(
+                    starting_values=starts[missing]
+                ).params
+
+            for j, row in zip(missing, fitted):
+                params[j] = row
+                cache.put(assets[j], keys[j], row)
+
+        garch.params = params
+        return self._sample_vol_fallback(garch.forecast_vol())
+
+    def _sample_vol_fallback(self, vols):
+        vols = np.asarray(vols, dtype=float).copy()
+        failed = ~np.isfinite(vols)
+        vols[failed] = np.sqrt(np.diag(self.shrunk_covariance()))[failed]
+        return pd.Series(vols, index=self.returns.columns)
+
     # -----------------------------
     # 3. CORRELATION ESTIMATION
     # -----------------------------
-    def correlation_matrix(self):
+    def shrunk_covariance(self):
 
-        lw = LedoitWolf().fit(self.returns.values)
-        cov = lw.covariance_
+        if self.shrunk_cov is None:
+            _, covs = ledoit_wolf_batch(self.returns.values[None])
+            self.shrunk_cov = covs[0]
 
+        return self.shrunk_cov
+
+    def correlation_matrix(self):
+
+        cov = self.shrunk_covariance()
         std_dev = np.sqrt(np.diag(cov))
         corr = cov / np.outer(std_dev, std_dev)
 
@@ -53,6 +253,9 @@ class DynamicRiskEngine:
     # -----------------------------
     def dynamic_covariance(self):
 
+        if self.cov_mode != "garch":
+            return self.cov_filter.advance(self.returns)
+
         vols = self.forecast_all_vols()
         corr = self.correlation_matrix()
 
@@ -0,0 +1,114 @@
+import numpy as np
+
+class FactorCovariance:
+    """
+    Structured covariance Sigma = B F B' + diag(d), with loadings B
+    (N x K), factor covariance F (K x K) and specific variances d (N).
+
+    Products, solves and quadratic forms cost O(N*K) (plus O(K^3) once
+    for the solve) and storage is O(N*K), so Sigma is never formed.
+    Products also work from the left and with NumPy matrices, so
+    ``P @ cov @ P.T`` reads the same as for a dense array.
+    """
+
+    __array_priority__ = 100
+
+    def __init__(self, loadings, factor_cov, specific_var):
+        self.loadings = np.asarray(loadings, dtype=float)
+        self.factor_cov = np.asarray(factor_cov, dtype=float)
+        self.specific_var = np.asarray(specific_var, dtype=float)
+        self._capacitance = None
+
+    @classmethod
+    def from_pca(cls, values, n_factors=5, min_specific_var=1e-10):
+        """
+        Statistical factor model from the first ``n_factors`` principal
+        components of a T x N return matrix.
+        """
+        X = values - values.mean(axis=0)
+        T = len(X)
+
+        _, s, vt = np.linalg.svd(X, full_matrices=False)
+
+        loadings = vt[:n_factors].T
+        factor_var = s[:n_factors] ** 2 / (T - 1)
+
+        total_var = (X ** 2).sum(axis=0) / (T - 1)
+        specific_var = total_var - (loadings ** 2) @ factor_var
+
+        return cls(loadings,
+                   np.diag(factor_var),
+                   np.maximum(specific_var, min_specific_var))
+
+    @property
+    def shape(self):
+        n = len(self.specific_var)
+        return (n, n)
+
+    # -----------------------------
+    # 1. PRODUCTS
+    # -----------------------------
+    def __matmul__(self, x):
+        x = np.asarray(x, dtype=float)
+        d = self.specific_var if x.ndim == 1 else self.specific_var[:, None]
+        return self.loadings @ (self.factor_cov @ (self.loadings.T @ x)) + d * x
+
+    def __rmatmul__(self, x):
+        # Sigma is symmetric, so x @ Sigma = (Sigma @ x')'
+        return (self @ np.asarray(x, dtype=float).T).T
+
+    def __mul__(self, c):
+        return FactorCovariance(self.loadings,
+                                c * self.factor_cov,
+                                c * self.specific_var)
+
+    __rmul__ = __mul__
+
+    def quad(self, w):
+        """
+        w' Sigma w (one value per column if ``w`` is N x M).
+        """
+        w = np.asarray(w, dtype=float)
+        f = self.loadings.T @ w
+        d = self.specific_var if w.ndim == 1 else self.specific_var[:, None]
+        return np.sum(f * (self.factor_cov @ f), axis=0) + np.sum(d * w ** 2, axis=0)
+
+    # -----------------------------
+    # 2. SOLVES (WOODBURY)
+    # -----------------------------
+    def solve(self, x):
+        """
+        Sigma^-1 x via Woodbury:
+        D^-1 x - D^-1 B (F^-1 + B' D^-1 B)^-1 B' D^-1 x
+        """
+        x = np.asarray(x, dtype=float)
+        d = self.specific_var if x.ndim == 1 else self.specific_var[:, None]
+
+        if self._capacitance is None:
+            B_scaled = self.loadings / self.specific_var[:, None]
+            self._capacitance = (np.linalg.inv(self.factor_cov) +
+                                 self.loadings.T @ B_scaled)
+
+        y = x / d
+        correction = np.linalg.solve(self._capacitance, self.loadings.T @ y)
+        return y - (self.loadings @ correction) / d
+
+    # -----------------------------
+    # 3. DENSE VIEWS
+    # -----------------------------
+    def diagonal(self):
+        return (np.einsum("ik,kl,il->i", self.loadings, self.factor_cov, self.loadings)
+                + self.specific_var)
+
+    def to_dense(self):
+        return (self.loadings @ self.factor_cov @ self.loadings.T +
+                np.diag(self.specific_var))
+
+def solve_covariance(cov, x):
+    """
+    cov^-1 x for a dense matrix or a FactorCovariance, without forming
+    the inverse.
+    """
+    if isinstance(cov, FactorCovariance):
+        return cov.solve(x)
+    return np.linalg.solve(np.asarray(cov), x)
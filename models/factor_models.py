@@ -1,26 +1,40 @@
 import statsmodels.api as sm
 import pandas as pd
+from utils.executor import TaskExecutor
+
+def _asset_expected_return(task):
+    """
+    Fama-French expected return of one asset; module level so that it
+    can be sent to worker processes.
+    """
+    y, factors = task
+    y = y.dropna()
+    X = factors.loc[y.index]
+    X = sm.add_constant(X)
+
+    model = sm.OLS(y, X).fit()
+    betas = model.params
+
+    factor_means = factors.mean()
+    return betas[0] + (betas[1:] * factor_means).sum()
 
 class FactorModel:
 
-    def __init__(self, returns, factors):
+    def __init__(self, returns, factors, executor=None):
         self.returns = returns
         self.factors = factors
+        # TaskExecutor for the per-asset regressions, serial by default
+        self.executor = executor or TaskExecutor()
 
     def fama_french_expected_returns(self):
-        expected_returns = {}
-
-        for asset in self.returns.columns:
-            y = self.returns[asset].dropna()
-            X = self.factors.loc[y.index]
-            X = sm.add_constant(X)
-
-            model = sm.OLS(y, X).fit()
-            betas = model.params
 
-            factor_means = self.factors.mean()
-            er = betas[0] + (betas[1:] * factor_means).sum()
+        # consolidated copies, so serial and worker processes see the same
+        # memory layout and reductions agree to the last bit
+        factors = self.factors.copy()
+        tasks = [(self.returns[asset].copy(), factors)
+                 for asset in self.returns.columns]
+        results = self.executor.map(_asset_expected_return, tasks)
 
-            expected_returns[asset] = er
+        expected_returns = dict(zip(self.returns.columns, results))
 
         return pd.Series(expected_returns)
@@ -1,4 +1,5 @@
 import numpy as np
+from models.factor_covariance import solve_covariance
 
 class GameTheoryAllocator:
 
@@ -10,10 +11,36 @@ class GameTheoryAllocator:
         """
         Risk player vs Return player
         """
-        inv_cov = np.linalg.inv(self.cov)
-        w = inv_cov @ self.returns
+        w = solve_covariance(self.cov, self.returns)
         w = w / np.sum(w)
 
         # risk penalty blending
         w = (1-lambda_risk)*w + lambda_risk*(np.ones(len(w))/len(w))
         return w
+
+class BatchedAllocator:
+    """
+    Inverse-covariance and Nash-blended weights for every rebalance
+    date at once: means is W x N, covs is W x N x N.
+    """
+
+    def __init__(self, means, covs):
+        self.means = np.asarray(means, dtype=float)
+        self.covs = np.asarray(covs, dtype=float)
+
+    def inverse_covariance_weights(self):
+        """
+        cov^-1 mu normalized to sum to one, one batched solve for all dates
+        """
+        w = np.linalg.solve(self.covs, self.means[..., None])[..., 0]
+        return w / w.sum(axis=-1, keepdims=True)
+
+    def nash_equilibrium(self, lambda_risks=(0.5,)):
+        """
+        nash_equilibrium for every date and lambda_risk, W x L x N
+        """
+        w = self.inverse_covariance_weights()
+        lam = np.asarray(lambda_risks, dtype=float)[None, :, None]
+        n = w.shape[-1]
+
+        return (1-lam)*w[:, None, :] + lam*(np.ones(n)/n)
@@ -0,0 +1,166 @@
+import hashlib
+import os
+import threading
+import time
+import numpy as np
+
+class GarchParameterCache:
+    """
+    Fitted GARCH(1,1) parameters ([mu, omega, alpha, beta]) shared
+    across rebalances and across backtests.
+
+    Two layers:
+    - warm starts: the last parameters fitted for each asset, used to
+      seed the next window's fit of the same asset;
+    - an optional on-disk store under ``path`` keyed by asset, window
+      bounds, a hash of the window's data and the fitting backend, so
+      the full, regime and dynamic backtests reuse one another's fits.
+
+    Hits, misses and time spent refitting are counted for ``summary()``.
+    A lock guards the lookups and counters for thread-pool execution;
+    process-pool workers get their own copy, whose counts the caller
+    folds back in with ``merge_stats``.
+    """
+
+    def __init__(self, path=None, warm_start=True):
+        self.path = path
+        self.warm_start = warm_start
+
+        self._memory = {}
+        self._previous = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.fit_seconds = 0.0
+
+        self._lock = threading.Lock()
+        # copies unpickled in worker processes keep the owner's pid
+        self._pid = os.getpid()
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    # -----------------------------
+    # 1. KEYS AND LOOKUP
+    # -----------------------------
+    @staticmethod
+    def key(asset, series, backend):
+        data_hash = hashlib.sha1(
+            np.ascontiguousarray(series.values, dtype=float).tobytes()
+        ).hexdigest()
+        raw = f"{asset}|{series.index[0]}|{series.index[-1]}|{data_hash}|{backend}"
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def _file(self, asset, key):
+        folder = os.path.join(self.path, hashlib.sha1(str(asset).encode()).hexdigest()[:16])
+        return os.path.join(folder, f"{key}.npy")
+
+    def checkpoint_settings(self):
+        # cached fits equal fresh ones; warm starts change the optimizer's path
+        return {"warm_start": self.warm_start}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def get(self, asset, key):
+        with self._lock:
+            params = self._memory.get(key)
+
+            if params is None and self.path is not None:
+                file = self._file(asset, key)
+                if os.path.exists(file):
+                    params = np.load(file)
+                    self._memory[key] = params
+
+            if params is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._previous[asset] = params
+
+        return params
+
+    def put(self, asset, key, params):
+        params = np.asarray(params, dtype=float)
+
+        with self._lock:
+            self._memory[key] = params
+            self._previous[asset] = params
+
+        if self.path is not None:
+            file = self._file(asset, key)
+            os.makedirs(os.path.dirname(file), exist_ok=True)
+            tmp = f"{file}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as handle:
+                np.save(handle, params)
+            os.replace(tmp, file)
+
+    def previous(self, asset):
+        """
+        Warm-start parameters for ``asset``, or None.
+        """
+        if not self.warm_start:
+            return None
+        with self._lock:
+            return self._previous.get(asset)
+
+    # -----------------------------
+    # 2. REPORTING
+    # -----------------------------
+    def timed(self):
+        return _FitTimer(self)
+
+    def add_fit_time(self, seconds):
+        with self._lock:
+            self.fit_seconds += seconds
+
+    def stats(self):
+        """
+        (hits, misses, fit_seconds) so far.
+        """
+        with self._lock:
+            return self.hits, self.misses, self.fit_seconds
+
+    def is_copy(self):
+        """
+        True in a process other than the one that built the cache.
+        """
+        return self._pid != os.getpid()
+
+    def merge_stats(self, hits, misses, fit_seconds):
+        """
+        Add counts made on another copy of the cache, e.g. in a worker
+        process.
+        """
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.fit_seconds += fit_seconds
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        return {
+            "GARCH_Cache_Hits": self.hits,
+            "GARCH_Cache_Misses": self.misses,
+            "GARCH_Cache_Hit_Rate": self.hits / lookups if lookups else 0.0,
+            "GARCH_Refit_Seconds": self.fit_seconds
+        }
+
+class _FitTimer:
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.cache.add_fit_time(time.perf_counter() - self.start)
+        return False
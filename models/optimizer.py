@@ -1,26 +1,92 @@
+import time
 import cvxpy as cp
 import numpy as np
+from models.factor_covariance import FactorCovariance
+
+# interior-point tolerances tight enough for weights to about 1e-12;
+# the solver defaults stop well short of that
+CLARABEL_TOLERANCES = {"tol_gap_abs": 1e-12, "tol_gap_rel": 1e-12, "tol_feas": 1e-12}
 
 class Optimizer:
+    """
+    Long-only max-Sharpe and min-variance portfolios.
+
+    Both are solved as min y' S y s.t. a'y = 1, y >= 0 and w = y / sum(y):
+    a = 1 gives the minimum-variance portfolio and a = mu - rf the
+    maximum-Sharpe one (the standard convex reformulation). The problem
+    is compiled once per Optimizer with ``a`` as a parameter, so further
+    calls (e.g. other rf values) only re-solve it. A re-solve is
+    warm-started only for an unchanged ``a``: starting min_variance from
+    a max-Sharpe solution stops a first-order solver such as OSQP at
+    the wrong weights, so the default is Clarabel with tight tolerances.
 
-    def __init__(self, expected_returns, cov):
-        self.mu = expected_returns.values
-        self.cov = cov.values
+    ``cov`` may be a DataFrame, an array (sample or shrunk) or a
+    FactorCovariance; the factor form keeps the problem at O(N*K) and
+    scales to thousands of assets.
+    """
+
+    def __init__(self, expected_returns, cov, solver="CLARABEL", solver_options=None):
+        self.mu = np.asarray(getattr(expected_returns, "values", expected_returns),
+                             dtype=float)
+        if isinstance(cov, FactorCovariance):
+            self.cov = cov
+        else:
+            self.cov = np.asarray(getattr(cov, "values", cov), dtype=float)
         self.n = len(self.mu)
+        self.solver = solver
+        if solver_options is None and solver == "CLARABEL":
+            solver_options = CLARABEL_TOLERANCES
+        self.solver_options = solver_options or {}
 
-    def max_sharpe(self, rf=0.0):
-        w = cp.Variable(self.n)
+        self._problem = None
+        self._last_a = None
+        self.solve_times = []
+
+    def _risk(self, y):
+
+        if isinstance(self.cov, FactorCovariance):
+            values, vectors = np.linalg.eigh(self.cov.factor_cov)
+            factor_sqrt = vectors * np.sqrt(np.clip(values, 0, None))
+            exposure = factor_sqrt.T @ self.cov.loadings.T
+
+            return (cp.sum_squares(exposure @ y) +
+                    cp.sum_squares(cp.multiply(np.sqrt(self.cov.specific_var), y)))
+
+        values, vectors = np.linalg.eigh(self.cov)
+        factor = vectors * np.sqrt(np.clip(values, 0, None))
 
-        objective = cp.Maximize(
-            (self.mu - rf) @ w
-        )
+        return cp.sum_squares(factor.T @ y)
+
+    def _solve(self, a):
+
+        if self._problem is None:
+            self._y = cp.Variable(self.n)
+            self._a = cp.Parameter(self.n)
+
+            self._problem = cp.Problem(cp.Minimize(self._risk(self._y)),
+                                       [self._a @ self._y == 1, self._y >= 0])
+
+        # scaled so that y stays O(1); w is normalized anyway
+        a = a / np.abs(a).max()
+        warm_start = self._last_a is not None and np.array_equal(a, self._last_a)
+        self._a.value = a
+        self._last_a = a
+
+        start = time.perf_counter()
+        self._problem.solve(solver=self.solver, warm_start=warm_start,
+                            **self.solver_options)
+        self.solve_times.append(time.perf_counter() - start)
+
+        y = np.clip(self._y.value, 0, None)
+        return y / y.sum()
+
+    def max_sharpe(self, rf=0.0):
 
-        constraints = [
-            cp.sum(w) == 1,
-            w >= 0
-        ]
+        excess = self.mu - rf
+        if excess.max() <= 0:
+            raise ValueError("max_sharpe needs an asset with expected return above rf")
 
-        prob = cp.Problem(objective, constraints)
-        prob.solve()
+        return self._solve(excess)
 
-        return w.value
+    def min_variance(self):
+        return self._solve(np.ones(self.n))
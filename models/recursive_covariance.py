@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+class EWMACovariance:
+    """
+    RiskMetrics covariance filter, S_t = lam * S_{t-1} + (1 - lam) r r'.
+
+    The filter keeps its state between calls, so a rolling backtest
+    that passes the same object to every rebalance only pays O(N^2)
+    per new day instead of re-estimating over the whole window.
+    """
+
+    def __init__(self, lam=0.94):
+        self.lam = lam
+        self.cov = None
+        self.last_date = None
+
+    def checkpoint_settings(self):
+        return {"lam": self.lam}
+
+    # -----------------------------
+    # 1. STATE
+    # -----------------------------
+    def initialize(self, values):
+        """
+        Seed the filter with the zero-mean second moment of ``values``.
+        """
+        self.cov = values.T @ values / len(values)
+
+    def update(self, r):
+        """
+        Consume one day of returns (length N); O(N^2).
+        """
+        self.cov *= self.lam
+        self.cov += (1 - self.lam) * np.outer(r, r)
+
+    def covariance(self):
+        """
+        One-day-ahead covariance forecast.
+        """
+        return self.cov.copy()
+
+    # -----------------------------
+    # 2. STREAMING OVER DATES
+    # -----------------------------
+    def advance(self, returns):
+        """
+        Bring the filter up to the last row of ``returns`` (a DataFrame
+        with a date index) and return the forecast for the next day.
+
+        Only rows after the last date already seen are consumed. If that
+        date is not in ``returns`` (first call, a gap, or going back in
+        time) the filter restarts from the rows of ``returns``.
+        """
+        values = returns.values
+
+        if self.last_date is None or self.last_date not in returns.index:
+            self.initialize(values)
+            start = 0
+        else:
+            start = returns.index.get_loc(self.last_date) + 1
+
+        for r in values[start:]:
+            self.update(r)
+
+        self.last_date = returns.index[-1]
+
+        return pd.DataFrame(self.covariance(),
+                            index=returns.columns,
+                            columns=returns.columns)
+
+class DCCCovariance(EWMACovariance):
+    """
+    DCC(1,1) correlation recursion on EWMA volatilities:
+
+        e_t = r_t / sigma_t
+        Q_t = (1 - a - b) * Q_bar + a * e e' + b * Q_{t-1}
+        R_t = diag(Q_t)^-1/2 Q_t diag(Q_t)^-1/2
+        Sigma_t = D_t R_t D_t
+
+    Q_bar is the correlation of the standardized returns of the window
+    the filter last advanced over (correlation targeting): it is set on
+    initialization and re-targeted at the end of every ``advance``, so a
+    filter shared across a walk-forward run reverts to the current
+    window's correlation rather than the first one's. Zero-variance
+    assets get zero correlation with the rest.
+    """
+
+    def __init__(self, a=0.02, b=0.97, lam=0.94):
+        if a < 0 or b < 0 or a + b >= 1:
+            raise ValueError("DCC parameters need a, b >= 0 and a + b < 1")
+
+        super().__init__(lam)
+        self.a = a
+        self.b = b
+        self.var = None
+        self.Q = None
+        self.Q_bar = None
+
+    def checkpoint_settings(self):
+        return {"a": self.a, "b": self.b, "lam": self.lam}
+
+    @staticmethod
+    def _standardize(values, var):
+        vol = np.sqrt(var)
+        return np.divide(values, vol, out=np.zeros_like(values, dtype=float),
+                         where=vol > 0)
+
+    def correlation_target(self, values):
+        """
+        Correlation of ``values`` standardized by their second moment.
+        """
+        e = self._standardize(values, (values ** 2).mean(axis=0))
+        target = e.T @ e / len(e)
+
+        d = np.sqrt(np.diag(target))
+        d[d == 0] = 1.0
+        target = target / np.outer(d, d)
+        np.fill_diagonal(target, 1.0)
+        return target
+
+    def initialize(self, values):
+        self.var = (values ** 2).mean(axis=0)
+        self.Q_bar = self.correlation_target(values)
+        self.Q = self.Q_bar.copy()
+
+    def advance(self, returns):
+        forecast = super().advance(returns)
+        self.Q_bar = self.correlation_target(returns.values)
+        return forecast
+
+    def update(self, r):
+        e = self._standardize(r, self.var)
+
+        self.Q *= self.b
+        self.Q += self.a * np.outer(e, e) + (1 - self.a - self.b) * self.Q_bar
+
+        self.var *= self.lam
+        self.var += (1 - self.lam) * r ** 2
+
+    def correlation(self):
+        d = np.sqrt(np.diag(self.Q))
+        return self.Q / np.outer(d, d)
+
+    def covariance(self):
+        vol = np.sqrt(self.var)
+        return self.correlation() * np.outer(vol, vol)
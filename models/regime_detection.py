@@ -1,21 +1,53 @@
 import numpy as np
 import pandas as pd
 
+# risk aversion applied to the covariance in each volatility regime
+REGIME_RISK_PENALTY = {"High Vol": 1.0, "Medium Vol": 0.5, "Low Vol": 0.2}
+
+def regime_risk_penalty(regime):
+    # unclassified days (not enough history yet) count as medium
+    return REGIME_RISK_PENALTY.get(regime, REGIME_RISK_PENALTY["Medium Vol"])
+
+def classify_vol(rolling_vol, low_threshold, high_threshold):
+    """
+    Regime of one average rolling vol, as in classify_regime.
+    """
+    if rolling_vol >= high_threshold:
+        return "High Vol"
+    if rolling_vol <= low_threshold:
+        return "Low Vol"
+    if rolling_vol > low_threshold:
+        return "Medium Vol"
+    return np.nan
+
 class RegimeDetector:
 
-    def __init__(self, returns, window=63):
+    def __init__(self, returns, window=63, thresholds=None):
         self.returns = returns
         self.window = window
+        # fixed (low, high) vol thresholds; by default the 25% / 75%
+        # quantiles of the whole sample, which a live run cannot know
+        self.thresholds = thresholds
 
     def compute_rolling_vol(self):
         return self.returns.rolling(self.window).std() * np.sqrt(252)
 
+    def vol_thresholds(self):
+        """
+        (low, high) thresholds: the fixed ones if given, else the 25% and
+        75% quantiles of the average rolling vol.
+        """
+        if self.thresholds is not None:
+            return self.thresholds
+
+        rolling_vol = self.compute_rolling_vol().mean(axis=1)
+        return rolling_vol.quantile(0.25), rolling_vol.quantile(0.75)
+
     def classify_regime(self):
 
         rolling_vol = self.compute_rolling_vol().mean(axis=1)
 
-        high_threshold = rolling_vol.quantile(0.75)
-        low_threshold = rolling_vol.quantile(0.25)
+        low_threshold, high_threshold = self.vol_thresholds()
 
         regimes = pd.Series(index=rolling_vol.index)
 
@@ -2,6 +2,8 @@ import numpy as np
 import pandas as pd
 from sklearn.covariance import LedoitWolf
 from arch import arch_model
+from models.batched_garch import BatchedGARCH
+from models.factor_covariance import FactorCovariance
 
 class RiskEngine:
 
@@ -18,6 +20,13 @@ class RiskEngine:
                             index=self.returns.columns,
                             columns=self.returns.columns)
 
+    def factor_covariance(self, n_factors=5):
+        """
+        PCA factor covariance (loadings, factor and specific variances),
+        O(N*K) in memory instead of O(N^2)
+        """
+        return FactorCovariance.from_pca(self.returns.values, n_factors)
+
     def garch_volatility(self, asset):
         """
         Univariate GARCH(1,1) forecast
@@ -27,3 +36,15 @@ class RiskEngine:
         forecast = res.forecast(horizon=1)
         variance = forecast.variance.iloc[-1, 0]
         return np.sqrt(variance) / 100
+
+    def garch_volatilities(self, backend="batched"):
+        """
+        GARCH(1,1) forecasts for every asset, either with one
+        arch_model per asset or all at once with BatchedGARCH
+        """
+        if backend == "batched":
+            garch = BatchedGARCH(self.returns.values).fit()
+            return pd.Series(garch.forecast_vol(), index=self.returns.columns)
+
+        return pd.Series({asset: self.garch_volatility(asset)
+                          for asset in self.returns.columns})
@@ -0,0 +1,134 @@
+import numpy as np
+
+class RollingCovariance:
+    """
+    Rolling mean / covariance from running sums.
+
+    The window is moved by adding the rows that enter it and removing
+    the rows that leave it, so a step of ``k`` rows costs O(k*N^2)
+    instead of O(window*N^2). Sums are accumulated around a fixed
+    shift (the mean of the first window) to limit cancellation, and
+    are rebuilt from scratch every ``refresh`` moves to stop round-off
+    from accumulating over long runs.
+    """
+
+    def __init__(self, values, window, refresh=50):
+        self.values = np.ascontiguousarray(values, dtype=float)
+        self.window = window
+        self.refresh = refresh
+        self.n_assets = self.values.shape[1]
+
+        self.start = 0
+        self.end = 0
+        self.shift = None
+        self._moves = 0
+
+    # -----------------------------
+    # 1. SUFFICIENT STATISTICS
+    # -----------------------------
+    def _rebuild(self, start, end):
+
+        rows = self.values[start:end]
+        self.shift = rows.mean(axis=0)
+
+        self.count = 0
+        self.sum = np.zeros(self.n_assets)
+        self.cross = np.zeros((self.n_assets, self.n_assets))
+        self.norm_sum = 0.0
+        self.norm_sq_sum = 0.0
+        self.norm_weighted = np.zeros(self.n_assets)
+
+        self.start = start
+        self.end = start
+        self._moves = 0
+        self._add(start, end)
+
+    def _add(self, start, end):
+        rows = self.values[start:end] - self.shift
+        self.count += len(rows)
+        self.sum += rows.sum(axis=0)
+        self.cross += rows.T @ rows
+
+        norms = np.einsum("ij,ij->i", rows, rows)
+        self.norm_sum += norms.sum()
+        self.norm_sq_sum += norms @ norms
+        self.norm_weighted += norms @ rows
+        self.end = end
+
+    def _remove(self, start, end):
+        rows = self.values[start:end] - self.shift
+        self.count -= len(rows)
+        self.sum -= rows.sum(axis=0)
+        self.cross -= rows.T @ rows
+
+        norms = np.einsum("ij,ij->i", rows, rows)
+        self.norm_sum -= norms.sum()
+        self.norm_sq_sum -= norms @ norms
+        self.norm_weighted -= norms @ rows
+        self.start = end
+
+    # -----------------------------
+    # 2. WINDOW MOVES
+    # -----------------------------
+    def roll_to(self, end):
+        """
+        Move the window so that it covers rows [end-window, end).
+        """
+        start = max(end - self.window, 0)
+
+        overlaps = (
+            self.shift is not None
+            and self.start <= start < self.end
+            and end >= self.end
+            and self._moves < self.refresh
+        )
+
+        if not overlaps:
+            self._rebuild(start, end)
+            return self
+
+        self._remove(self.start, start)
+        self._add(self.end, end)
+        self._moves += 1
+
+        return self
+
+    def rebase(self, offset):
+        """
+        Follow the rows of ``values`` after they were moved ``offset``
+        places towards the front (e.g. a compacted streaming buffer).
+        """
+        self.start -= offset
+        self.end -= offset
+        return self
+
+    def windows(self, ends):
+        """
+        Yield (end, mean, covariance) for each window end in ``ends``.
+        """
+        for end in ends:
+            self.roll_to(end)
+            yield end, self.mean(), self.covariance()
+
+    # -----------------------------
+    # 3. ESTIMATES
+    # -----------------------------
+    def mean(self):
+        return self.shift + self.sum / self.count
+
+    def covariance(self, ddof=1):
+        centered = self.sum / self.count
+        scatter = self.cross - self.count * np.outer(centered, centered)
+        return scatter / (self.count - ddof)
+
+    def statistics(self):
+        """
+        Snapshot of the shifted sums for the current window:
+        (count, sum, cross, norm_sum, norm_sq_sum, norm_weighted).
+        """
+        return (self.count,
+                self.sum.copy(),
+                self.cross.copy(),
+                self.norm_sum,
+                self.norm_sq_sum,
+                self.norm_weighted.copy())
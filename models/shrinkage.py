@@ -0,0 +1,116 @@
+import numpy as np
+from models.rolling_covariance import RollingCovariance
+
+# -----------------------------
+# 1. BATCHED LEDOIT-WOLF CORE
+# -----------------------------
+def _shrink(emp_covs, beta_sums, n_samples):
+    """
+    Ledoit-Wolf intensity and shrunk covariance for a stack of
+    biased (1/T) covariances, following sklearn's
+    ``ledoit_wolf_shrinkage``. ``beta_sums`` holds sum_t ||x_t||^4
+    of the centered rows of each window.
+    """
+    n_features = emp_covs.shape[-1]
+
+    if n_features == 1:
+        return np.zeros(len(emp_covs)), emp_covs.copy()
+
+    trace = np.trace(emp_covs, axis1=1, axis2=2)
+    mu = trace / n_features
+
+    delta_ = np.sum(emp_covs ** 2, axis=(1, 2))
+    beta = (beta_sums / n_samples - delta_) / (n_features * n_samples)
+
+    delta = (delta_ - 2.0 * mu * trace + n_features * mu ** 2) / n_features
+    beta = np.minimum(beta, delta)
+
+    shrinkage = np.divide(beta, delta,
+                          out=np.zeros_like(beta),
+                          where=beta != 0)
+
+    shrunk = (1.0 - shrinkage)[:, None, None] * emp_covs
+    diag = np.arange(n_features)
+    shrunk[:, diag, diag] += (shrinkage * mu)[:, None]
+
+    return shrinkage, shrunk
+
+def ledoit_wolf_batch(windows):
+    """
+    Ledoit-Wolf shrinkage for a (W, T, N) stack of return windows.
+
+    Returns (shrinkage, covariances) with shapes (W,) and (W, N, N),
+    matching ``sklearn.covariance.LedoitWolf().fit`` window by window.
+    """
+    X = np.asarray(windows, dtype=float)
+    X = X - X.mean(axis=1, keepdims=True)
+    n_samples = X.shape[1]
+
+    emp_covs = np.matmul(X.transpose(0, 2, 1), X) / n_samples
+    beta_sums = np.sum(np.sum(X ** 2, axis=2) ** 2, axis=1)
+
+    return _shrink(emp_covs, beta_sums, n_samples)
+
+# -----------------------------
+# 2. FROM SUFFICIENT STATISTICS
+# -----------------------------
+def ledoit_wolf_from_statistics(count, total, cross,
+                                norm_sum, norm_sq_sum, norm_weighted):
+    """
+    Ledoit-Wolf shrinkage from stacked ``RollingCovariance.statistics()``
+    snapshots (leading axis = window). The fourth-moment term
+    sum_t ||x_t - m||^4 is expanded in the raw sums so no window rows
+    are needed.
+    """
+    count = np.asarray(count, dtype=float)
+    total = np.asarray(total, dtype=float)
+    cross = np.asarray(cross, dtype=float)
+    norm_sum = np.asarray(norm_sum, dtype=float)
+    norm_sq_sum = np.asarray(norm_sq_sum, dtype=float)
+    norm_weighted = np.asarray(norm_weighted, dtype=float)
+
+    m = total / count[:, None]
+    m_sq = np.einsum("wi,wi->w", m, m)
+
+    emp_covs = cross / count[:, None, None] - m[:, :, None] * m[:, None, :]
+
+    beta_sums = (
+        norm_sq_sum
+        - 4.0 * np.einsum("wi,wi->w", m, norm_weighted)
+        + 4.0 * np.einsum("wi,wij,wj->w", m, cross, m)
+        + 2.0 * m_sq * norm_sum
+        - 4.0 * m_sq * np.einsum("wi,wi->w", m, total)
+        + count * m_sq ** 2
+    )
+
+    return _shrink(emp_covs, beta_sums, count)
+
+def rolling_ledoit_wolf(values, window, ends):
+    """
+    Means, sample covariances and Ledoit-Wolf covariances for the
+    windows [end-window, end) of every ``end`` in ``ends``, with the
+    shrinkage done in one batched pass.
+
+    Returns (means, sample_covs, shrinkage, lw_covs).
+    """
+    if len(ends) == 0:
+        N = np.shape(values)[1]
+        return np.empty((0, N)), np.empty((0, N, N)), np.empty(0), np.empty((0, N, N))
+
+    moments = RollingCovariance(values, window)
+
+    means = []
+    sample_covs = []
+    stats = []
+
+    for end in ends:
+        moments.roll_to(end)
+        means.append(moments.mean())
+        sample_covs.append(moments.covariance())
+        stats.append(moments.statistics())
+
+    shrinkage, lw_covs = ledoit_wolf_from_statistics(
+        *[np.array(s) for s in zip(*stats)]
+    )
+
+    return np.array(means), np.array(sample_covs), shrinkage, lw_covs
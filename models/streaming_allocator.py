@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+from models.rolling_covariance import RollingCovariance
+from models.shrinkage import ledoit_wolf_from_statistics
+from models.dynamic_risk import DynamicRiskEngine
+from models.black_litterman import black_litterman_posteriors
+from models.esg_optimizer import NativeESGOptimizer
+from models.regime_detection import classify_vol, regime_risk_penalty
+
+class StreamingRegimeAllocator:
+    """
+    Live counterpart of RollingRegimeModel: takes one day of returns at
+    a time and emits target weights on rebalance days.
+
+    Per day, the window's running sums (mean, covariance and
+    Ledoit-Wolf statistics), the regime's rolling vols and a streaming
+    cov_filter, if one is in ``risk_options``, are updated in O(N^2);
+    the sums are rebuilt from the buffered rows every ``window`` days to
+    stop round-off building up. On rebalance days the dynamic
+    covariance, Black-Litterman posterior and ESG weights are computed
+    for the last ``window`` days, exactly as the batch model does for
+    the same window (GARCH refits only happen then).
+
+    The regime thresholds must be fixed up front, e.g. from
+    ``RegimeDetector(history).vol_thresholds()``; weights then match
+    ``RollingRegimeModel(..., regime_thresholds=...)`` on the same
+    history.
+    """
+
+    def __init__(self, columns, esg_scores, regime_thresholds,
+                 window=252, rebalance=21, risk_options=None,
+                 regime_window=63, min_esg_score=60):
+        self.columns = pd.Index(columns)
+        self.esg = esg_scores
+        self.low_threshold, self.high_threshold = regime_thresholds
+        self.window = window
+        self.rebalance = rebalance
+        # keyword arguments for DynamicRiskEngine, as in RollingRegimeModel
+        self.risk_options = risk_options or {}
+        self.regime_window = regime_window
+        self.min_esg_score = min_esg_score
+
+        n_assets = len(self.columns)
+        self.market_weights = np.ones(n_assets) / n_assets
+        self.optimizer = NativeESGOptimizer(n_assets)
+
+        # rows are appended to a buffer twice the history needed and
+        # the newest half is moved to the front when it fills up
+        self._history = max(window, regime_window)
+        self._buffer = np.zeros((2 * self._history, n_assets))
+        self._dates = np.empty(2 * self._history, dtype=object)
+        self._size = 0
+
+        self._moments = RollingCovariance(self._buffer, window, refresh=window)
+        self._vol_moments = RollingCovariance(self._buffer, regime_window,
+                                              refresh=regime_window)
+
+        self.days = 0
+        self.regime = np.nan
+        self.weights = None
+        self.rebalance_date = None
+
+    # -----------------------------
+    # 1. DAILY UPDATE
+    # -----------------------------
+    def _append(self, row, date):
+
+        if self._size == len(self._buffer):
+            offset = self._size - self._history
+            self._buffer[:self._history] = self._buffer[offset:]
+            self._dates[:self._history] = self._dates[offset:]
+            self._size = self._history
+            self._moments.rebase(offset)
+            self._vol_moments.rebase(offset)
+
+        self._buffer[self._size] = row
+        self._dates[self._size] = date
+        self._size += 1
+        self.days += 1
+
+    def update(self, row, date):
+        """
+        Consume one day of returns (length N, ordered as ``columns``).
+        Returns the new target weights on rebalance days, else None.
+        """
+        row = np.asarray(row, dtype=float)
+        self._append(row, date)
+
+        self._moments.roll_to(self._size)
+        self._vol_moments.roll_to(self._size)
+
+        if self.days >= self.regime_window:
+            vol = np.sqrt(np.diag(self._vol_moments.covariance()) * 252)
+            self.regime = classify_vol(vol.mean(), self.low_threshold,
+                                       self.high_threshold)
+
+        # filters seeded at an earlier rebalance consume the day now, so
+        # the rebalance-day advance has nothing left to do
+        cov_filter = self.risk_options.get("cov_filter")
+        if cov_filter is not None and cov_filter.last_date is not None:
+            cov_filter.update(row)
+            cov_filter.last_date = date
+
+        if self.days < self.window or (self.days - self.window) % self.rebalance:
+            return None
+
+        self.weights = self.rebalance_weights()
+        self.rebalance_date = date
+        return self.weights
+
+    def replay(self, returns):
+        """
+        Feed a returns DataFrame day by day; returns the rebalance dates
+        (last training day) and the weights emitted on them.
+        """
+        dates = []
+        weights = []
+
+        for date, row in zip(returns.index, returns[self.columns].values):
+            w = self.update(row, date)
+            if w is not None:
+                dates.append(date)
+                weights.append(w)
+
+        return pd.Index(dates), np.array(weights)
+
+    # -----------------------------
+    # 2. REBALANCE
+    # -----------------------------
+    def rebalance_weights(self):
+
+        mean = self._moments.mean()
+        _, lw_covs = ledoit_wolf_from_statistics(
+            *[np.array([s]) for s in self._moments.statistics()]
+        )
+
+        start = self._size - self.window
+        frame = pd.DataFrame(self._buffer[start:self._size],
+                             index=pd.Index(self._dates[start:self._size]),
+                             columns=self.columns)
+        cov = DynamicRiskEngine(frame, shrunk_cov=lw_covs[0],
+                                **self.risk_options).dynamic_covariance().values
+
+        mu_bl = black_litterman_posteriors(cov[None], self.market_weights,
+                                           np.eye(len(self.columns)),
+                                           mean[None])[0]
+
+        return self.optimizer.optimize(mu_bl,
+                                       regime_risk_penalty(self.regime) * cov,
+                                       self.esg.values,
+                                       min_esg_score=self.min_esg_score)
@@ -1,17 +1,115 @@
 import numpy as np
+import pandas as pd
 
 class TransactionCostModel:
+    """
+    Rebalance costs in return units (per unit of portfolio value):
+
+        cost_k = sum_i q_ki * (c + s_i / 2 + eta * sigma_i * sqrt(q_ki * V / ADV_i))
+
+    for the traded weights q_ki = |w_k - w_{k-1}| (the first rebalance
+    trades from cash, as in BacktestEngine.run_schedule): a linear fee
+    ``c`` per unit turnover, half the quoted spread ``s``, and
+    square-root market impact with coefficient ``eta``, daily
+    volatility ``sigma``, portfolio value ``V`` and average daily
+    traded value ``ADV``. spread, adv and volatility are per asset
+    (N) or per rebalance and asset (K x N).
+
+    cost_per_turnover, impact and portfolio_value may also be 1-D
+    arrays of cost assumptions, broadcast against each other; costs are
+    then computed for all S scenarios in one pass (e.g. a capacity
+    study over portfolio values).
+    """
+
+    def __init__(self, cost_per_turnover=0.001, spread=0.0, impact=0.0,
+                 adv=None, volatility=None, portfolio_value=1.0):
+        self.cost_per_turnover = cost_per_turnover
+        self.spread = spread
+        self.impact = impact
+        self.adv = adv
+        self.volatility = volatility
+        self.portfolio_value = portfolio_value
 
     def turnover(self, weights):
         weight_changes = np.diff(weights, axis=0)
         return np.sum(np.abs(weight_changes), axis=1)
 
-    def apply_costs(self, returns, weights, cost_per_turnover=0.001):
+    # -----------------------------
+    # 1. COSTS PER REBALANCE
+    # -----------------------------
+    def trades(self, weights, pre_trade=None):
+        """
+        Traded weight per rebalance and asset, K x N. ``pre_trade``
+        holds the weights just before each rebalance (e.g. drifted
+        holdings); by default the previous targets, starting from cash.
+        """
+        W = np.asarray(weights, dtype=float)
+        if pre_trade is None:
+            pre_trade = np.vstack([np.zeros(W.shape[1]), W[:-1]])
+        return np.abs(W - np.asarray(pre_trade, dtype=float))
+
+    def scenarios(self):
+        """
+        (cost_per_turnover, impact, portfolio_value) broadcast to S
+        scenarios.
+        """
+        return np.broadcast_arrays(np.atleast_1d(np.asarray(self.cost_per_turnover, dtype=float)),
+                                   np.atleast_1d(np.asarray(self.impact, dtype=float)),
+                                   np.atleast_1d(np.asarray(self.portfolio_value, dtype=float)))
+
+    def rebalance_costs(self, weights, pre_trade=None):
+        """
+        Cost of every rebalance: K, or S x K for arrays of assumptions.
+        """
+        q = self.trades(weights, pre_trade)
+        linear, impact, value = self.scenarios()
+
+        costs = linear[:, None] * q.sum(axis=1)
+        costs += np.sum(q * np.asarray(self.spread, dtype=float) / 2, axis=1)
+
+        if np.any(impact != 0):
+            if self.adv is None or self.volatility is None:
+                raise ValueError("Square-root impact needs adv and volatility")
+
+            participation = value[:, None, None] * q / np.asarray(self.adv, dtype=float)
+            costs += impact[:, None] * np.einsum(
+                "kn,skn->sk", q * np.asarray(self.volatility, dtype=float),
+                np.sqrt(participation)
+            )
+
+        single = all(np.ndim(p) == 0 for p in
+                     (self.cost_per_turnover, self.impact, self.portfolio_value))
+        return costs[0] if single else costs
+
+    # -----------------------------
+    # 2. NET RETURNS
+    # -----------------------------
+    def apply_costs(self, returns, weights, positions, pre_trade=None):
+        """
+        ``returns`` less each rebalance's cost, charged on its first
+        holding day: row positions[k] of ``returns``, or the date
+        positions[k] if ``returns`` is a Series and positions are dates.
+        With S cost scenarios the result has one column per scenario.
+        """
+        positions = np.asarray(positions)
+        if isinstance(returns, pd.Series) and not np.issubdtype(positions.dtype, np.integer):
+            positions = returns.index.get_indexer(positions)
+            if np.any(positions < 0):
+                raise ValueError("Rebalance dates missing from the returns index")
+
+        costs = self.rebalance_costs(weights, pre_trade)
+        values = np.asarray(returns, dtype=float)
 
-        turnover_series = self.turnover(weights)
-        adjusted_returns = returns.copy()
+        charged = np.zeros((len(values),) + costs.shape[:-1])
+        np.add.at(charged, positions, costs.T)
 
-        for i in range(1, len(turnover_series)):
-            adjusted_returns[i] -= cost_per_turnover * turnover_series[i-1]
+        if costs.ndim == 1:
+            adjusted = values - charged
+        else:
+            adjusted = values[:, None] - charged
 
-        return adjusted_returns
+        if not isinstance(returns, pd.Series):
+            return adjusted
+        if adjusted.ndim == 1:
+            return pd.Series(adjusted, index=returns.index, name=returns.name)
+        return pd.DataFrame(adjusted, index=returns.index)
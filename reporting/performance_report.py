@@ -31,3 +31,30 @@ class PerformanceReport:
             "Annual_Return": self.returns.mean() * 252,
             "Annual_Volatility": self.returns.std() * np.sqrt(252)
         }
+
+def performance_summary(returns):
+    """
+    PerformanceReport.summary for every column of a T x S returns
+    DataFrame (or array) at once; one row per strategy.
+    """
+    frame = pd.DataFrame(returns)
+    R = frame.values
+
+    mean = R.mean(axis=0)
+    std = R.std(axis=0, ddof=1)
+
+    # std of the negative days only, per column
+    downside = np.where(R < 0, R, np.nan)
+    downside_std = np.nanstd(downside, axis=0, ddof=1)
+
+    cumulative = np.cumprod(1 + R, axis=0)
+    max_drawdown = (cumulative / np.maximum.accumulate(cumulative, axis=0) - 1).min(axis=0)
+
+    return pd.DataFrame({
+        "Sharpe": np.sqrt(252) * mean / std,
+        "Sortino": np.sqrt(252) * mean / downside_std,
+        "Calmar": mean * 252 / np.abs(max_drawdown),
+        "Max_Drawdown": max_drawdown,
+        "Annual_Return": mean * 252,
+        "Annual_Volatility": std * np.sqrt(252)
+    }, index=frame.columns)
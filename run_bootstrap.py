@@ -1,11 +1,24 @@
+import numpy as np
 import pandas as pd
 from validation.bootstrap_validation import BootstrapValidator
+from utils.config_loader import load_config
+
+config = load_config("config/base_config.yaml")
 
 returns = pd.read_csv("data/processed/returns.csv", index_col=0)
 weights = pd.read_csv("results/final_weights.csv").values.flatten()
 
-bootstrap = BootstrapValidator(returns, weights)
-distribution = bootstrap.block_bootstrap()
+bootstrap = BootstrapValidator(returns, weights,
+                               n_bootstrap=config["bootstrap"]["n_samples"],
+                               seed=config["random_seed"])
+block_size = config["bootstrap"]["block_size"]
+distribution = bootstrap.block_bootstrap(block_size)
 
 print("Bootstrap Mean Return:", distribution.mean())
 print("Bootstrap 5% Quantile:", np.percentile(distribution, 5))
+
+# mean, Sharpe, drawdown and CVaR under both resampling schemes
+for method in ("block", "stationary"):
+    statistics = bootstrap.bootstrap_statistics(block_size, method=method)
+    print(method, "bootstrap 5% / 50% / 95% quantiles:")
+    print(statistics.quantile([0.05, 0.5, 0.95]))
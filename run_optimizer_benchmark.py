@@ -0,0 +1,85 @@
+import time
+import cvxpy as cp
+import numpy as np
+import pandas as pd
+from models.optimizer import Optimizer, CLARABEL_TOLERANCES
+from models.shrinkage import ledoit_wolf_batch
+from models.factor_covariance import FactorCovariance
+from utils.seed_control import set_global_seed
+
+# Solve time of max-Sharpe and min-variance versus universe size, for a
+# dense Ledoit-Wolf covariance and a 10-factor PCA covariance
+
+set_global_seed(42)
+
+# -----------------------------
+# 1. ACCURACY CHECK
+# -----------------------------
+# both call orders on a small universe against a plain quad_form QP, so
+# the timings below are of correct solves
+
+def reference_weights(a, cov):
+    y = cp.Variable(len(a))
+    cp.Problem(cp.Minimize(cp.quad_form(y, cp.psd_wrap(cov))),
+               [a @ y == 1, y >= 0]).solve(solver="CLARABEL", **CLARABEL_TOLERANCES)
+    return y.value / y.value.sum()
+
+returns = np.random.normal(0, 0.01, (252, 15)) + np.random.normal(0, 0.01, (252, 1))
+mu = returns.mean(axis=0) + np.random.normal(0.0005, 0.001, 15)
+cov = np.cov(returns.T)
+
+expected = {"max_sharpe": reference_weights(mu, cov),
+            "min_variance": reference_weights(np.ones(15), cov)}
+
+for order in (["max_sharpe", "min_variance"], ["min_variance", "max_sharpe"]):
+    optimizer = Optimizer(mu, cov)
+    for name in order:
+        gap = np.abs(getattr(optimizer, name)() - expected[name]).max()
+        print(f"{' -> '.join(order)}: {name} max weight gap {gap:.1e}")
+        if gap > 1e-6:
+            raise RuntimeError(f"{name} is off the reference QP by {gap:.1e}")
+
+# -----------------------------
+# 2. SOLVE TIMES
+# -----------------------------
+
+T = 252
+N_FACTORS = 10
+universe_sizes = [100, 250, 500, 1000, 2000, 3000]
+max_dense = 1000   # dense problems beyond this size take minutes
+
+rows = []
+
+for n in universe_sizes:
+
+    # synthetic returns with a 5-factor structure
+    loadings = np.random.normal(0, 1, (n, 5))
+    factors = np.random.normal(0, 0.01, (T, 5))
+    returns = factors @ loadings.T + np.random.normal(0, 0.02, (T, n))
+    mu = returns.mean(axis=0) + 0.001
+
+    covariances = {"factor": FactorCovariance.from_pca(returns, N_FACTORS)}
+    if n <= max_dense:
+        covariances["ledoit_wolf"] = ledoit_wolf_batch(returns[None])[1][0]
+
+    for name, cov in covariances.items():
+
+        optimizer = Optimizer(mu, cov)
+
+        start = time.perf_counter()
+        optimizer.max_sharpe()
+        first = time.perf_counter() - start
+
+        start = time.perf_counter()
+        optimizer.min_variance()
+        resolve = time.perf_counter() - start
+
+        rows.append({
+            "N": n,
+            "Covariance": name,
+            "Max_Sharpe_Seconds": first,      # includes compiling
+            "Min_Variance_Seconds": resolve   # re-solve of the same problem
+        })
+        print(rows[-1])
+
+pd.DataFrame(rows).to_csv("results/optimizer_benchmark.csv", index=False)
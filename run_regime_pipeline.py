@@ -1,15 +1,25 @@
 import pandas as pd
 from validation.rolling_regime_model import RollingRegimeModel
 from reporting.performance_report import PerformanceReport
+from models.garch_cache import GarchParameterCache
+from utils.checkpoint_store import CheckpointStore
 
 returns = pd.read_csv("data/processed/returns.csv", index_col=0, parse_dates=True)
 esg = pd.read_csv("data/raw/esg_scores.csv", index_col=0)
 
-model = RollingRegimeModel(returns, esg)
+# fits are shared with the other rolling pipelines through the cache
+garch_cache = GarchParameterCache("cache/garch")
+# reruns on appended data only compute the new rebalance dates
+checkpoint = CheckpointStore("cache/checkpoints")
+
+model = RollingRegimeModel(returns, esg, risk_options={"param_cache": garch_cache},
+                           checkpoint=checkpoint)
 portfolio_returns, weights = model.run()
 
 report = PerformanceReport(portfolio_returns)
 results = report.summary()
 
 print(results)
+print(garch_cache.summary())
+print(checkpoint.summary())
 pd.Series(results).to_csv("results/regime_model_performance.csv")
@@ -0,0 +1,31 @@
+import pandas as pd
+from validation.strategy_bootstrap import StrategyBootstrap
+from utils.checkpoint_store import CheckpointStore
+from utils.config_loader import load_config
+from utils.executor import TaskExecutor
+
+config = load_config("config/base_config.yaml")
+
+returns = pd.read_csv("data/processed/returns.csv", index_col=0, parse_dates=True)
+esg = pd.read_csv("data/raw/esg_scores.csv", index_col=0)
+
+bootstrap_config = config["bootstrap"]
+
+# finished paths are kept on disk; rerunning after an interruption
+# only runs the remaining ones
+bootstrap = StrategyBootstrap(
+    returns, esg,
+    n_paths=bootstrap_config["strategy_paths"],
+    block_size=bootstrap_config["block_size"],
+    method=bootstrap_config["strategy_method"],
+    model_options={"window": config["data"]["window"],
+                   "rebalance": config["data"]["rebalance"],
+                   "min_esg_score": config["esg"]["min_score"]},
+    executor=TaskExecutor.from_config(config),
+    store=CheckpointStore(bootstrap_config["strategy_results_dir"])
+)
+results = bootstrap.run()
+
+print(f"{len(results)} paths")
+print(results.quantile([0.05, 0.5, 0.95]))
+results.to_csv("results/strategy_bootstrap_summary.csv")
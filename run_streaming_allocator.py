@@ -0,0 +1,32 @@
+import time
+import pandas as pd
+from models.regime_detection import RegimeDetector
+from models.streaming_allocator import StreamingRegimeAllocator
+from models.garch_cache import GarchParameterCache
+
+returns = pd.read_csv("data/processed/returns.csv", index_col=0, parse_dates=True)
+esg = pd.read_csv("data/raw/esg_scores.csv", index_col=0)
+
+# regime thresholds fixed from the first year, as they would be live
+thresholds = RegimeDetector(returns.iloc[:252]).vol_thresholds()
+
+allocator = StreamingRegimeAllocator(
+    returns.columns, esg, thresholds,
+    risk_options={"param_cache": GarchParameterCache("cache/garch")}
+)
+
+# replay the history one day at a time, timing every update
+weights = {}
+latencies = []
+for date, row in zip(returns.index, returns.values):
+    start = time.perf_counter()
+    w = allocator.update(row, date)
+    latencies.append(time.perf_counter() - start)
+
+    if w is not None:
+        weights[date] = w
+
+latencies = pd.Series(latencies, index=returns.index)
+print(latencies.describe())
+
+pd.DataFrame(weights, index=returns.columns).T.to_csv("results/streaming_weights.csv")
@@ -1,13 +1,15 @@
 from validation.covariance_validation import CovarianceValidator
 from validation.rolling_backtest import RollingBacktester
 from validation.performance_analysis import PerformanceAnalyzer
+from utils.covariance_store import CovarianceStore
 import pandas as pd
 
 # Load processed returns
 returns = pd.read_csv("data/processed/returns.csv", index_col=0, parse_dates=True)
 
 # 1. Covariance Stability
-cov_validator = CovarianceValidator(returns)
+# rolling estimates are persisted once and reused by later runs
+cov_validator = CovarianceValidator(returns, store=CovarianceStore("cache/covariance"))
 condition_df = cov_validator.compare_condition_numbers()
 condition_df.to_csv("results/covariance_condition_numbers.csv")
 
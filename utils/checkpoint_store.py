@@ -0,0 +1,111 @@
+import hashlib
+import os
+import numpy as np
+
+def describe_settings(value):
+    """
+    Stable text form of a model setting for checkpoint keys: scalars,
+    nested dicts, lists and tuples, arrays (by hash), classes (by name)
+    and objects that describe themselves with ``checkpoint_settings()``.
+    Anything else raises, rather than being left out of the key.
+    """
+    if value is None or isinstance(value, (str, bool, int, float, np.generic)):
+        return repr(value)
+
+    if isinstance(value, dict):
+        items = sorted((str(name), describe_settings(item)) for name, item in value.items())
+        return "{" + ", ".join(f"{name}: {item}" for name, item in items) + "}"
+
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(describe_settings(item) for item in value) + "]"
+
+    if isinstance(value, np.ndarray):
+        data_hash = hashlib.sha1(np.ascontiguousarray(value).tobytes()).hexdigest()
+        return f"array{value.shape}{value.dtype}:{data_hash}"
+
+    if isinstance(value, type):
+        return value.__name__
+
+    if hasattr(value, "checkpoint_settings"):
+        return f"{type(value).__name__}{describe_settings(value.checkpoint_settings())}"
+
+    raise ValueError(f"Cannot key checkpoints on a setting of type "
+                     f"{type(value).__name__}; give it a checkpoint_settings() method")
+
+class CheckpointStore:
+    """
+    Per-rebalance results of the rolling models (dynamic covariance,
+    posterior means, weights) saved as ``.npz`` files.
+
+    Each rebalance is keyed by a hash of its training window's data,
+    its dates and the settings of the model that produced it. Appending
+    new returns leaves the keys of earlier windows unchanged, so a
+    rerun only computes the new rebalance dates.
+
+    StrategyBootstrap uses the same store as its on-disk result set, one
+    entry per resampled path.
+    """
+
+    def __init__(self, path="cache/checkpoints"):
+        self.path = path
+        self._memory = {}
+
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def key(window_values, dates, settings):
+        data_hash = hashlib.sha1(
+            np.ascontiguousarray(window_values, dtype=float).tobytes()
+        ).hexdigest()
+        raw = f"{dates[0]}|{dates[-1]}|{data_hash}|{settings}"
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def checkpoint_settings(self):
+        # where results are saved does not change them
+        return {}
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.npz")
+
+    def get(self, key):
+        """
+        Dict of saved arrays for ``key``, or None.
+        """
+        saved = self._memory.get(key)
+
+        if saved is None and os.path.exists(self._file(key)):
+            with np.load(self._file(key)) as data:
+                saved = {name: data[name] for name in data.files}
+            self._memory[key] = saved
+
+        if saved is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return saved
+
+    def put(self, key, **arrays):
+        """
+        Save ``arrays`` under ``key``, keeping any saved earlier.
+        """
+        saved = dict(self._memory.get(key) or {})
+        saved.update({name: np.asarray(value) for name, value in arrays.items()})
+        self._memory[key] = saved
+
+        file = self._file(key)
+        tmp = f"{file}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as handle:
+            np.savez(handle, **saved)
+        os.replace(tmp, file)
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        return {
+            "Checkpoint_Hits": self.hits,
+            "Checkpoint_Misses": self.misses,
+            "Checkpoint_Hit_Rate": self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+
+class CovarianceStore:
+    """
+    Rolling covariance estimates persisted as T x N x N ``.npy`` cubes
+    and opened as read-only memory maps.
+
+    Each cube is saved under an estimator tag (e.g. "sample", "lw") next
+    to a JSON sidecar that holds the window end dates, the asset columns,
+    the window length and a fingerprint of the returns it was built from.
+    A cube is reused only when the fingerprint matches.
+    """
+
+    def __init__(self, path="cache/covariance"):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def fingerprint(returns, window):
+        digest = hashlib.sha1(
+            np.ascontiguousarray(returns.values, dtype=float).tobytes()
+        )
+        digest.update(f"{list(returns.columns)}|{list(map(str, returns.index))}|{window}".encode())
+        return digest.hexdigest()
+
+    def _files(self, tag):
+        base = os.path.join(self.path, tag)
+        return f"{base}.npy", f"{base}.json"
+
+    # -----------------------------
+    # 1. READ
+    # -----------------------------
+    def load(self, tag, fingerprint=None):
+        """
+        (cube, dates) for ``tag``, or None if it is missing or was built
+        from other data. The cube is a read-only memmap: slicing it
+        reads from disk without copying the whole file.
+        """
+        cube_file, meta_file = self._files(tag)
+
+        if not (os.path.exists(cube_file) and os.path.exists(meta_file)):
+            return None
+
+        with open(meta_file) as handle:
+            meta = json.load(handle)
+
+        if fingerprint is not None and meta["fingerprint"] != fingerprint:
+            return None
+
+        cube = np.load(cube_file, mmap_mode="r")
+        return cube, pd.to_datetime(meta["dates"])
+
+    # -----------------------------
+    # 2. WRITE
+    # -----------------------------
+    def create(self, tag, shape):
+        """
+        Writable memmap of ``shape`` to be filled by the caller and then
+        registered with ``commit``.
+        """
+        cube_file, _ = self._files(tag)
+        return np.lib.format.open_memmap(f"{cube_file}.tmp", mode="w+",
+                                         dtype=float, shape=shape)
+
+    def commit(self, tag, cube, dates, columns, window, fingerprint):
+        cube_file, meta_file = self._files(tag)
+
+        cube.flush()
+        del cube
+        os.replace(f"{cube_file}.tmp", cube_file)
+
+        meta = {
+            "tag": tag,
+            "window": window,
+            "columns": [str(c) for c in columns],
+            "dates": [str(d) for d in dates],
+            "fingerprint": fingerprint
+        }
+        with open(f"{meta_file}.tmp", "w") as handle:
+            json.dump(meta, handle)
+        os.replace(f"{meta_file}.tmp", meta_file)
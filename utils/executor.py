@@ -0,0 +1,138 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+import os
+import numpy as np
+
+EXECUTION_MODES = ("serial", "thread", "process")
+
+# shared-memory buffers this process has attached to, by name
+_ATTACHED = {}
+
+def _call(task):
+    fn, item = task
+    return fn(item)
+
+def _seeded_call(task):
+    fn, item, seed = task
+    return fn(item, np.random.default_rng(seed))
+
+class TaskExecutor:
+    """
+    Runs independent tasks serially, on a thread pool or on a process
+    pool, and always returns results in input order.
+
+    For process mode ``fn`` must be picklable (a module-level function
+    or a bound method of a picklable object).
+    """
+
+    def __init__(self, mode="serial", max_workers=None, seed=None):
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode: {mode}")
+
+        self.mode = mode
+        self.max_workers = max_workers
+        self.seed = seed
+
+    @classmethod
+    def from_config(cls, config):
+        execution = config.get("execution", {})
+        return cls(mode=execution.get("mode", "serial"),
+                   max_workers=execution.get("max_workers"),
+                   seed=config.get("random_seed"))
+
+    def checkpoint_settings(self):
+        # results are the same in every mode
+        return {}
+
+    def task_seeds(self, n_tasks):
+        """
+        One independent seed per task, derived from ``seed`` and the
+        task position only, so they do not depend on the mode.
+        """
+        children = np.random.SeedSequence(self.seed).spawn(n_tasks)
+        return [int(child.generate_state(1)[0]) for child in children]
+
+    def map(self, fn, items, seeded=False):
+        """
+        Apply ``fn`` to every item. With ``seeded=True`` it is called as
+        ``fn(item, rng)`` with a per-task ``np.random.Generator``, which
+        keeps random draws identical across modes.
+        """
+        items = list(items)
+
+        if seeded:
+            tasks = list(zip([fn] * len(items), items, self.task_seeds(len(items))))
+            call = _seeded_call
+        else:
+            tasks = list(zip([fn] * len(items), items))
+            call = _call
+
+        if self.mode == "serial" or len(tasks) <= 1:
+            return [call(task) for task in tasks]
+
+        if self.mode == "thread":
+            with ThreadPoolExecutor(self.max_workers) as pool:
+                return list(pool.map(call, tasks))
+
+        workers = self.max_workers or os.cpu_count()
+        chunksize = max(1, len(tasks) // (4 * workers))
+
+        with ProcessPoolExecutor(workers) as pool:
+            return list(pool.map(call, tasks, chunksize=chunksize))
+
+def _attach(name):
+    """
+    Attach to an existing shared-memory block without registering it
+    with this process's resource tracker, so only the owner unlinks it.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no ``track`` argument
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args, **kwargs: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+class SharedArray:
+    """
+    Read-only copy of an array in shared memory. It pickles as its
+    name, shape and dtype, so process-pool tasks that carry it attach
+    to the one buffer instead of receiving a copy of the data.
+
+    The creating process owns the buffer and must ``close()`` it.
+    """
+
+    def __init__(self, array):
+        array = np.ascontiguousarray(array)
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self._owner = True
+        self.shape = array.shape
+        self.dtype = array.dtype
+
+        np.ndarray(self.shape, self.dtype, buffer=self._shm.buf)[...] = array
+
+    def __getstate__(self):
+        return self._shm.name, self.shape, self.dtype.str
+
+    def __setstate__(self, state):
+        name, self.shape, dtype = state
+        self.dtype = np.dtype(dtype)
+        self._owner = False
+
+        if name not in _ATTACHED:
+            _ATTACHED[name] = _attach(name)
+        self._shm = _ATTACHED[name]
+
+    def array(self):
+        view = np.ndarray(self.shape, self.dtype, buffer=self._shm.buf)
+        view.flags.writeable = False
+        return view
+
+    def close(self):
+        if self._owner:
+            self._shm.close()
+            self._shm.unlink()
@@ -0,0 +1,131 @@
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from utils.executor import SharedArray
+
+class WalkForwardScheduler:
+    """
+    Train/test windows of a rolling backtest over one contiguous copy
+    of the returns panel.
+
+    Rebalance k trains on rows [ends[k] - window, ends[k]) and holds on
+    rows [ends[k], ends[k] + rebalance). Windows are handed out as
+    NumPy views (or DataFrames wrapping those views) with their date
+    labels, so no data is copied per iteration.
+    """
+
+    def __init__(self, returns, window=252, rebalance=21, stop=None):
+        self.values = np.ascontiguousarray(returns.values, dtype=float)
+        self.index = returns.index
+        self.columns = returns.columns
+        self.window = window
+        self.rebalance = rebalance
+
+        if stop is None:
+            stop = len(self.values)
+        self.ends = np.arange(window, stop, rebalance)
+
+        self._shared = None
+
+    def __len__(self):
+        return len(self.ends)
+
+    # -----------------------------
+    # 1. INDEX RANGES
+    # -----------------------------
+    def train_range(self, k):
+        end = self.ends[k]
+        return end - self.window, end
+
+    def test_range(self, k):
+        end = self.ends[k]
+        return end, min(end + self.rebalance, len(self.values))
+
+    def train_dates(self, k):
+        start, end = self.train_range(k)
+        return self.index[start:end]
+
+    def train_end_dates(self):
+        """
+        Date label of the last training row of every window.
+        """
+        return self.index[self.ends - 1]
+
+    # -----------------------------
+    # 2. ZERO-COPY WINDOWS
+    # -----------------------------
+    def train_values(self, k):
+        start, end = self.train_range(k)
+        return self.values[start:end]
+
+    def test_values(self, k):
+        start, end = self.test_range(k)
+        return self.values[start:end]
+
+    def train_frame(self, k):
+        """
+        Training window as a DataFrame on a view of the panel.
+        """
+        start, end = self.train_range(k)
+        return pd.DataFrame(self.values[start:end],
+                            index=self.index[start:end],
+                            columns=self.columns,
+                            copy=False)
+
+    def train_windows(self):
+        """
+        All training windows as one read-only K x window x N strided view.
+        """
+        if len(self.ends) == 0:
+            return np.empty((0, self.window, self.values.shape[1]))
+
+        windows = np.lib.stride_tricks.sliding_window_view(
+            self.values, self.window, axis=0
+        )
+        first = self.ends[0] - self.window
+        return windows[first::self.rebalance][:len(self.ends)].swapaxes(1, 2)
+
+    # -----------------------------
+    # 3. SHARING WITH WORKER PROCESSES
+    # -----------------------------
+    @contextmanager
+    def shared(self):
+        """
+        Within the block the panel lives in shared memory and the
+        scheduler pickles without it, so every process-pool task
+        reads the same read-only buffer.
+        """
+        self._shared = SharedArray(self.values)
+        try:
+            yield self
+        finally:
+            shared, self._shared = self._shared, None
+            shared.close()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self._shared is not None:
+            del state["values"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if "values" not in state:
+            self.values = self._shared.array()
+
+    def map_windows(self, executor, fn, *per_window, windows=None):
+        """
+        executor.map of ``fn`` over (scheduler, k, *items) for every
+        rebalance k (or the ones in ``windows``, which ``per_window``
+        then follows), in date order; process pools read the panel from
+        shared memory.
+        """
+        if windows is None:
+            windows = range(len(self))
+        tasks = [(self, k) + items for k, items in zip(windows, zip(*per_window))]
+
+        if executor.mode != "process":
+            return executor.map(fn, tasks)
+
+        with self.shared():
+            return executor.map(fn, tasks)
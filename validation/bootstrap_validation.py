@@ -1,29 +1,211 @@
 import numpy as np
 import pandas as pd
-from reporting.performance_report import PerformanceReport
+
+# -----------------------------
+# RESAMPLING SCHEMES
+# -----------------------------
+def block_starts(rng, n, T, block_size):
+    """
+    n x n_blocks start days of moving blocks covering T days; the last
+    block is cut to fit.
+    """
+    n_blocks = -(-T // block_size)
+    return rng.integers(0, T - block_size, size=(n, n_blocks))
+
+def stationary_indices(rng, n, T, mean_block_size):
+    """
+    Politis-Romano stationary bootstrap: n x T day indices made of
+    blocks of geometric length (mean ``mean_block_size``) at uniform
+    random days, wrapping around the end of the series. Indices run up
+    to 2T - 2, i.e. they address the series stored twice.
+    """
+    n_blocks = int(1.5 * T / mean_block_size) + 20
+
+    lengths = rng.geometric(1.0 / mean_block_size, size=(n, n_blocks))
+    starts = rng.integers(0, T, size=(n, n_blocks))
+
+    # cut every row to exactly T days
+    covered = np.cumsum(lengths, axis=1)
+    lengths[:, -1] += np.maximum(T - covered[:, -1], 0)
+    lengths = np.minimum(lengths, np.clip(T - (covered - lengths), 0, None)).ravel()
+
+    begins = np.cumsum(lengths) - lengths
+    indices = np.repeat(starts.ravel() - begins, lengths) + np.arange(n * T)
+    return indices.reshape(n, T)
 
 class BootstrapValidator:
+    """
+    Block and stationary bootstrap of a fixed-weight portfolio.
+
+    The portfolio's daily returns are computed once; replications are
+    integer index arrays into that series, drawn ``chunk_size`` at a
+    time from a seeded Generator, so memory stays at chunk_size x T
+    whatever ``n_bootstrap`` is.
+    """
 
-    def __init__(self, returns, weights, n_bootstrap=500):
+    def __init__(self, returns, weights, n_bootstrap=500, seed=None,
+                 chunk_size=1000):
         self.returns = returns
         self.weights = weights
         self.n_bootstrap = n_bootstrap
+        self.rng = np.random.default_rng(seed)
+        self.chunk_size = chunk_size
+
+        r = np.asarray(returns, dtype=float) @ np.asarray(weights, dtype=float)
+        self.portfolio_returns = r
 
+        # running sums of returns, squares and log growth; the series
+        # is stored twice so wrapped blocks index it without a modulo
+        self._doubled = np.concatenate([r, r])
+        self._log_doubled = np.log1p(self._doubled)
+        self._csum = np.concatenate([[0.0], np.cumsum(r)])
+        self._csum_sq = np.concatenate([[0.0], np.cumsum(r ** 2)])
+        self._csum_log = np.concatenate([[0.0], np.cumsum(np.log1p(r))])
+
+    def _chunks(self):
+        for start in range(0, self.n_bootstrap, self.chunk_size):
+            yield min(self.chunk_size, self.n_bootstrap - start)
+
+    # -----------------------------
+    # 1. RESAMPLED INDICES
+    # -----------------------------
+    def block_starts(self, n, block_size):
+        return block_starts(self.rng, n, len(self.portfolio_returns), block_size)
+
+    def block_lengths(self, block_size):
+        T = len(self.portfolio_returns)
+        lengths = np.full(-(-T // block_size), block_size)
+        lengths[-1] = T - block_size * (len(lengths) - 1)
+        return lengths
+
+    def stationary_indices(self, n, mean_block_size):
+        return stationary_indices(self.rng, n, len(self.portfolio_returns),
+                                  mean_block_size)
+
+    # -----------------------------
+    # 2. REPLICATED STATISTICS
+    # -----------------------------
     def block_bootstrap(self, block_size=21):
+        """
+        Annualized mean return of every replication, from block sums of
+        the running total; no resampled series is built.
+        """
+        T = len(self.portfolio_returns)
+        lengths = self.block_lengths(block_size)
+
+        means = []
+        for n in self._chunks():
+            starts = self.block_starts(n, block_size)
+            sums = self._csum[starts + lengths] - self._csum[starts]
+            means.append(sums.sum(axis=1) / T)
+
+        return np.concatenate(means) * 252
+
+    def _block_tables(self, length):
+        """
+        Sum, sum of squares, log growth, lowest and highest point of the
+        log wealth path and the drawdown inside a block of ``length``
+        days, for every start day.
+        """
+        T = len(self.portfolio_returns)
+        starts = np.arange(T - length + 1)
+
+        paths = np.lib.stride_tricks.sliding_window_view(self._csum_log[1:], length)
+        paths = paths - self._csum_log[:T - length + 1, None]
+
+        return {
+            "sum": self._csum[starts + length] - self._csum[starts],
+            "sq": self._csum_sq[starts + length] - self._csum_sq[starts],
+            "log": paths[:, -1],
+            "low": paths.min(axis=1),
+            "high": paths.max(axis=1),
+            "drawdown": (paths - np.maximum.accumulate(paths, axis=1)).min(axis=1)
+        }
+
+    def _summarize(self, sums, squares, drawdown, tail):
+        T = len(self.portfolio_returns)
+        mean = sums / T
+        std = np.sqrt((squares - sums * mean) / (T - 1))
+
+        return pd.DataFrame({
+            "Annual_Return": mean * 252,
+            "Sharpe": np.sqrt(252) * mean / std,
+            "Max_Drawdown": np.expm1(drawdown),
+            "CVaR": tail.mean(axis=1)
+        })
+
+    def _tail(self, sampled, alpha):
+        # worst ceil(alpha * T) days of each replication; sorts in place
+        k = max(int(np.ceil(alpha * sampled.shape[1])), 1)
+        sampled.partition(k - 1, axis=1)
+        return sampled[:, :k]
+
+    def _moving_block_statistics(self, n, block_size, tables, alpha):
+
+        last = self.block_lengths(block_size)[-1]
+        starts = self.block_starts(n, block_size)
+
+        def table(name):
+            # full blocks, then the last one cut to fit
+            return np.concatenate([tables[block_size][name][starts[:, :-1]],
+                                   tables[last][name][starts[:, -1:]]], axis=1)
+
+        # log wealth at the start of each block and the running peak
+        # before it; a block's worst point is either below that peak or
+        # inside the block itself
+        log_growth = table("log")
+        offsets = np.cumsum(log_growth, axis=1) - log_growth
+        peaks = np.maximum.accumulate(offsets + table("high"), axis=1)
+        peaks = np.concatenate([np.full((n, 1), -np.inf), peaks[:, :-1]], axis=1)
+        drawdown = np.minimum(offsets + table("low") - peaks, table("drawdown")).min(axis=1)
+
+        # the resampled series itself is only needed for the CVaR
+        windows = np.lib.stride_tricks.sliding_window_view(self.portfolio_returns,
+                                                           block_size)
+        sampled = windows[starts].reshape(n, -1)[:, :len(self.portfolio_returns)]
+
+        return self._summarize(table("sum").sum(axis=1), table("sq").sum(axis=1),
+                               drawdown, self._tail(sampled, alpha))
+
+    def _resampled_statistics(self, indices, alpha):
+
+        sampled = self._doubled[indices]
+        log_wealth = np.cumsum(self._log_doubled[indices], axis=1)
+        drawdown = (log_wealth - np.maximum.accumulate(log_wealth, axis=1)).min(axis=1)
 
-        portfolio_returns = []
+        return self._summarize(sampled.sum(axis=1),
+                               np.einsum("ij,ij->i", sampled, sampled),
+                               drawdown, self._tail(sampled, alpha))
 
-        for _ in range(self.n_bootstrap):
+    def bootstrap_statistics(self, block_size=21, method="block", alpha=0.05):
+        """
+        Annual return, Sharpe, max drawdown and CVaR (mean of the worst
+        ``alpha`` share of days) for ``n_bootstrap`` replications, one
+        row each. method="block" resamples moving blocks of
+        ``block_size`` days, using per-start block tables so only the
+        CVaR needs the resampled series; method="stationary" uses
+        geometric block lengths with mean ``block_size``.
+        """
+        if method not in ("block", "stationary"):
+            raise ValueError(f"Unknown bootstrap method: {method}")
 
-            indices = []
-            while len(indices) < len(self.returns):
-                start = np.random.randint(0, len(self.returns)-block_size)
-                indices.extend(range(start, start+block_size))
+        if method == "block":
+            tables = {length: self._block_tables(length)
+                      for length in set(self.block_lengths(block_size))}
 
-            indices = indices[:len(self.returns)]
-            sampled = self.returns.iloc[indices]
+        results = []
+        for n in self._chunks():
+            if method == "block":
+                results.append(self._moving_block_statistics(n, block_size, tables, alpha))
+            else:
+                indices = self.stationary_indices(n, block_size)
+                results.append(self._resampled_statistics(indices, alpha))
 
-            port = sampled @ self.weights
-            portfolio_returns.append(port.mean()*252)
+        return pd.concat(results, ignore_index=True)
 
-        return np.array(portfolio_returns)
+    def observed_statistics(self, alpha=0.05):
+        """
+        The same statistics for the actual portfolio returns.
+        """
+        indices = np.arange(len(self.portfolio_returns))[None]
+        return self._resampled_statistics(indices, alpha).iloc[0]
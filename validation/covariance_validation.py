@@ -1,52 +1,113 @@
 import numpy as np
 import pandas as pd
-from numpy.linalg import norm, cond, eigvals
-from sklearn.covariance import LedoitWolf
+from models.shrinkage import rolling_ledoit_wolf
+from utils.walk_forward import WalkForwardScheduler
 
 class CovarianceValidator:
 
-    def __init__(self, returns, window=252):
+    def __init__(self, returns, window=252, store=None, chunk_size=256):
         self.returns = returns
         self.window = window
+        # optional CovarianceStore; without it the cubes live in memory
+        self.store = store
+        # windows processed per batch when building and reducing cubes
+        self.chunk_size = chunk_size
+        self._cubes = None
 
-    def rolling_covariances(self):
-        sample_covs = []
-        lw_covs = []
+    # -----------------------------
+    # 1. ROLLING COVARIANCE CUBES
+    # -----------------------------
+    def covariance_cubes(self):
+        """
+        Sample and Ledoit-Wolf estimates for every window as T x N x N
+        arrays, computed once and reused by all diagnostics.
+        """
+        if self._cubes is not None:
+            return self._cubes
+
+        schedule = WalkForwardScheduler(self.returns, self.window, rebalance=1)
+        ends = schedule.ends
+        dates = schedule.train_end_dates()
+        n = self.returns.shape[1]
+
+        if self.store is None:
+            _, sample_cube, _, lw_cube = rolling_ledoit_wolf(
+                schedule.values, self.window, ends
+            )
+            self._cubes = sample_cube, lw_cube, dates
+            return self._cubes
+
+        fingerprint = self.store.fingerprint(self.returns, self.window)
+        sample = self.store.load("sample", fingerprint)
+        lw = self.store.load("lw", fingerprint)
 
-        for i in range(self.window, len(self.returns)):
-            window_data = self.returns.iloc[i-self.window:i]
+        if sample is None or lw is None:
+            sample_cube = self.store.create("sample", (len(ends), n, n))
+            lw_cube = self.store.create("lw", (len(ends), n, n))
 
-            sample_cov = window_data.cov()
-            lw = LedoitWolf().fit(window_data.values)
-            lw_cov = pd.DataFrame(lw.covariance_,
-                                  index=sample_cov.index,
-                                  columns=sample_cov.columns)
+            for start in range(0, len(ends), self.chunk_size):
+                chunk = slice(start, start + self.chunk_size)
+                _, sample_cube[chunk], _, lw_cube[chunk] = rolling_ledoit_wolf(
+                    schedule.values, self.window, ends[chunk]
+                )
 
-            sample_covs.append(sample_cov)
-            lw_covs.append(lw_cov)
+            for tag, cube in (("sample", sample_cube), ("lw", lw_cube)):
+                self.store.commit(tag, cube, dates, self.returns.columns,
+                                  self.window, fingerprint)
+
+            sample = self.store.load("sample", fingerprint)
+            lw = self.store.load("lw", fingerprint)
+
+        self._cubes = sample[0], lw[0], dates
+        return self._cubes
+
+    def rolling_covariances(self):
+        columns = self.returns.columns
+        sample_stack, lw_stack, _ = self.covariance_cubes()
+
+        sample_covs = [pd.DataFrame(cov, index=columns, columns=columns)
+                       for cov in sample_stack]
+        lw_covs = [pd.DataFrame(cov, index=columns, columns=columns)
+                   for cov in lw_stack]
 
         return sample_covs, lw_covs
 
-    def covariance_stability(self):
-        sample_covs, lw_covs = self.rolling_covariances()
+    def _chunks(self, cube, overlap=0):
+        for start in range(0, len(cube), self.chunk_size):
+            yield np.asarray(cube[max(start - overlap, 0):start + self.chunk_size])
 
-        sample_diffs = []
-        lw_diffs = []
+    # -----------------------------
+    # 2. BATCHED DIAGNOSTICS
+    # -----------------------------
+    def stability_norms(self, cube):
+        """
+        Frobenius norm of each window-to-window change.
+        """
+        norms = [np.linalg.norm(np.diff(chunk, axis=0), axis=(1, 2))
+                 for chunk in self._chunks(cube, overlap=1)]
+        return np.concatenate(norms)
 
-        for i in range(1, len(sample_covs)):
-            sample_diffs.append(
-                norm(sample_covs[i] - sample_covs[i-1], 'fro')
-            )
-            lw_diffs.append(
-                norm(lw_covs[i] - lw_covs[i-1], 'fro')
-            )
+    def eigen_spectra(self, cube):
+        """
+        Ascending eigenvalues of every window, T x N.
+        """
+        return np.concatenate([np.linalg.eigvalsh(chunk)
+                               for chunk in self._chunks(cube)])
 
-        return np.mean(sample_diffs), np.mean(lw_diffs)
+    def condition_series(self, cube):
+        # symmetric matrices: the 2-norm condition number is the ratio
+        # of extreme absolute eigenvalues
+        spectra = np.abs(self.eigen_spectra(cube))
+        return spectra.max(axis=1) / spectra.min(axis=1)
 
-    def condition_numbers(self):
-        sample_covs, lw_covs = self.rolling_covariances()
+    def covariance_stability(self):
+        sample_cube, lw_cube, _ = self.covariance_cubes()
 
-        sample_cond = np.mean([cond(cov) for cov in sample_covs])
-        lw_cond = np.mean([cond(cov) for cov in lw_covs])
+        return (np.mean(self.stability_norms(sample_cube)),
+                np.mean(self.stability_norms(lw_cube)))
+
+    def condition_numbers(self):
+        sample_cube, lw_cube, _ = self.covariance_cubes()
 
-        return sample_cond, lw_cond
+        return (np.mean(self.condition_series(sample_cube)),
+                np.mean(self.condition_series(lw_cube)))
@@ -1,23 +1,28 @@
-import numpy as np
 import pandas as pd
 from validation.rolling_full_model import RollingFullModel
 from reporting.performance_report import PerformanceReport
+from utils.executor import TaskExecutor
 
 class HyperparameterSensitivity:
 
-    def __init__(self, returns, esg_scores):
+    def __init__(self, returns, esg_scores, executor=None):
         self.returns = returns
         self.esg = esg_scores
+        # TaskExecutor for the model's per-rebalance covariances and the
+        # threshold blocks, serial by default as in RollingFullModel
+        self.executor = executor or TaskExecutor()
 
     def test_esg_threshold(self, thresholds=[50,60,70]):
 
+        # one rolling run for the covariances and posteriors; the
+        # thresholds fan out over the executor
+        model = RollingFullModel(self.returns, self.esg, executor=self.executor)
+        sweep = model.run_threshold_sweep(thresholds)
+
         results = {}
 
         for t in thresholds:
-            model = RollingFullModel(self.returns, self.esg)
-            portfolio_returns, _ = model.run()
-
-            report = PerformanceReport(portfolio_returns)
+            report = PerformanceReport(sweep[t].values)
             results[f"ESG_{t}"] = report.sharpe()
 
         return pd.Series(results)
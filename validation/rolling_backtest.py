@@ -1,6 +1,10 @@
 import numpy as np
 import pandas as pd
-from sklearn.covariance import LedoitWolf
+from models.shrinkage import rolling_ledoit_wolf
+from models.game_theory import BatchedAllocator
+from backtesting.backtest_engine import BacktestEngine
+from reporting.performance_report import performance_summary
+from utils.walk_forward import WalkForwardScheduler
 
 class RollingBacktest:
 
@@ -8,35 +12,43 @@ class RollingBacktest:
         self.returns = returns
         self.window = window
         self.rebalance = rebalance
-
-    def optimize_weights(self, mu, cov):
-        inv_cov = np.linalg.inv(cov)
-        w = inv_cov @ mu
-        w = w / np.sum(w)
-        return w
+        self.schedule = WalkForwardScheduler(returns, window, rebalance,
+                                             stop=len(returns)-rebalance)
+
+    def compare(self, weights, names=None, block_size=32):
+        """
+        Daily returns, turnover and summary metrics of many strategies:
+        ``weights`` holds S target schedules on the rebalance dates
+        (S x K x N, or an iterable of K x N schedules), held daily over
+        each rebalance period.
+        """
+        engine = BacktestEngine(self.schedule.values)
+        portfolio_returns, turnover = engine.run_strategies(
+            weights, self.schedule.ends, horizon=self.rebalance,
+            drift=False, block_size=block_size
+        )
+
+        portfolio_returns = pd.DataFrame(portfolio_returns.T, columns=names)
+        summary = performance_summary(portfolio_returns)
+
+        return portfolio_returns, turnover, summary
 
     def run(self):
-        results = {
-            "equal": [],
-            "sample": [],
-            "lw": []
-        }
-
-        for i in range(self.window, len(self.returns)-self.rebalance, self.rebalance):
-            train = self.returns.iloc[i-self.window:i]
-            test = self.returns.iloc[i:i+self.rebalance]
-
-            mu = train.mean().values
+        ends = self.schedule.ends
+        means, sample_covs, _, lw_covs = rolling_ledoit_wolf(
+            self.schedule.values, self.window, ends
+        )
 
-            sample_cov = train.cov().values
-            lw_cov = LedoitWolf().fit(train.values).covariance_
+        # inverse-covariance weights for every date in one batched solve
+        sample_weights = BatchedAllocator(means, sample_covs).inverse_covariance_weights()
+        lw_weights = BatchedAllocator(means, lw_covs).inverse_covariance_weights()
 
-            w_equal = np.ones(len(mu)) / len(mu)
-            w_sample = self.optimize_weights(mu, sample_cov)
-            w_lw = self.optimize_weights(mu, lw_cov)
+        equal_weights = np.ones_like(means) / means.shape[1]
 
-            results["equal"].extend(test.values @ w_equal)
-            results["sample"].extend(test.values @ w_sample)
-            results["lw"].extend(test.values @ w_lw)
+        # targets are held daily over each rebalance period
+        results, _, _ = self.compare(
+            np.array([equal_weights, sample_weights, lw_weights]),
+            names=["equal", "sample", "lw"]
+        )
 
-        return pd.DataFrame(results)
+        return results
@@ -1,38 +1,51 @@
-import numpy as np
 from models.dynamic_risk import DynamicRiskEngine
+from models.shrinkage import rolling_ledoit_wolf
+from models.game_theory import BatchedAllocator
+from models.risk_budgeting import RiskBudgeting
+from backtesting.backtest_engine import BacktestEngine
+from utils.walk_forward import WalkForwardScheduler
 
 class RollingDynamicBacktester:
 
-    def __init__(self, returns, window=252, rebalance=21):
+    def __init__(self, returns, window=252, rebalance=21,
+                 risk_options=None, allocation="inverse_covariance"):
+        if allocation not in ("inverse_covariance", "risk_parity"):
+            raise ValueError(f"Unknown allocation: {allocation}")
+
         self.returns = returns
         self.window = window
         self.rebalance = rebalance
-
-    def optimize_weights(self, mu, cov):
-        inv_cov = np.linalg.inv(cov)
-        w = inv_cov @ mu
-        w = w / np.sum(w)
-        return w
+        # keyword arguments for DynamicRiskEngine, e.g. garch_backend
+        self.risk_options = risk_options or {}
+        # "inverse_covariance" (cov^-1 mu) or "risk_parity" (equal risk
+        # contributions, no cvxpy, cheap enough for daily rebalancing)
+        self.allocation = allocation
 
     def run(self):
 
-        portfolio_returns = []
-        weights_history = []
-
-        for i in range(self.window, len(self.returns), self.rebalance):
-
-            train = self.returns.iloc[i-self.window:i]
-            test = self.returns.iloc[i:i+self.rebalance]
+        schedule = WalkForwardScheduler(self.returns, self.window, self.rebalance)
+        ends = schedule.ends
+        means, _, _, lw_covs = rolling_ledoit_wolf(
+            schedule.values, self.window, ends
+        )
 
-            mu = train.mean().values
+        dynamic_covs = []
+        for k in range(len(schedule)):
 
-            risk_engine = DynamicRiskEngine(train)
-            dynamic_cov = risk_engine.dynamic_covariance().values
+            risk_engine = DynamicRiskEngine(schedule.train_frame(k),
+                                            shrunk_cov=lw_covs[k],
+                                            **self.risk_options)
+            dynamic_covs.append(risk_engine.dynamic_covariance().values)
 
-            w = self.optimize_weights(mu, dynamic_cov)
-            weights_history.append(w)
+        # all dates in one batched call
+        if self.allocation == "risk_parity":
+            all_weights = RiskBudgeting(dynamic_covs).weights()
+        else:
+            all_weights = BatchedAllocator(means, dynamic_covs).inverse_covariance_weights()
 
-            test_portfolio = test @ w
-            portfolio_returns.extend(test_portfolio.values)
+        # targets are held daily over each rebalance period
+        portfolio_returns, _, _ = BacktestEngine(schedule.values).run_schedule(
+            all_weights, ends, horizon=self.rebalance, drift=False
+        )
 
-        return np.array(portfolio_returns), np.array(weights_history)
+        return portfolio_returns, all_weights
@@ -1,50 +1,182 @@
+import hashlib
+import os
 import numpy as np
 import pandas as pd
-from models.dynamic_risk import DynamicRiskEngine
-from models.bl_dynamic import BlackLittermanDynamic
-from models.esg_optimizer import ESGOptimizer
+from models.dynamic_risk import window_covariances, check_window_independent, check_checkpointable
+from models.shrinkage import rolling_ledoit_wolf
+from models.black_litterman import black_litterman_posteriors
+from models.esg_optimizer import NativeESGOptimizer, esg_frontier
+from utils.executor import TaskExecutor
+from backtesting.backtest_engine import BacktestEngine
+from utils.walk_forward import WalkForwardScheduler
+from utils.checkpoint_store import describe_settings
+
+def threshold_weights(task):
+    """
+    ESG weights at every rebalance for a block of thresholds, dates x
+    thresholds x assets. At each date the block is solved as one
+    esg_frontier sweep, every threshold warm-started from its
+    neighbour. Module level so that it can be sent to worker processes.
+    """
+    mu_bls, dynamic_covs, esg, thresholds = task
+
+    return np.array([esg_frontier(mu_bl, cov, esg, min_esg_scores=thresholds)[0]
+                     for mu_bl, cov in zip(mu_bls, dynamic_covs)])
 
 class RollingFullModel:
 
-    def __init__(self, returns, esg_scores, window=252, rebalance=21):
+    def __init__(self, returns, esg_scores, window=252, rebalance=21,
+                 risk_options=None, min_esg_score=60, executor=None,
+                 checkpoint=None):
         self.returns = returns
         self.esg = esg_scores
         self.window = window
         self.rebalance = rebalance
+        # keyword arguments for DynamicRiskEngine, e.g. garch_backend
+        self.risk_options = risk_options or {}
+        self.min_esg_score = min_esg_score
+        # TaskExecutor fanning the per-rebalance covariances out over
+        # dates (process pools read the returns from shared memory). The
+        # ESG solves stay in date order, so weights and returns match
+        # serial mode exactly; options that carry state across dates are
+        # rejected outside serial mode.
+        self.executor = executor or TaskExecutor()
+        if self.executor.mode != "serial":
+            check_window_independent(self.risk_options)
+        # native active-set QP, warm-started from one rebalance to the next
+        self.optimizer = NativeESGOptimizer(len(returns.columns))
+        self.schedule = WalkForwardScheduler(returns, window, rebalance)
+        # optional CheckpointStore: rebalances whose training window was
+        # seen before are loaded rather than recomputed, so appending
+        # data only computes the new dates. A shared cov_filter cannot
+        # resume mid-stream, so it is rejected here.
+        self.checkpoint = checkpoint
+        if checkpoint is not None:
+            check_checkpointable(self.risk_options)
+        self._keys = None
+        self._saved = None
 
-    def run(self):
+    def checkpoint_keys(self):
+        """
+        Checkpoint key of every rebalance, from its training window and
+        the settings the results depend on.
+        """
+        options = describe_settings(self.risk_options)
+        esg_hash = hashlib.sha1(
+            np.ascontiguousarray(self.esg.values, dtype=float).tobytes()
+        ).hexdigest()
+        settings = (f"{type(self).__name__}|{self.window}|{options}|"
+                    f"{self.min_esg_score}|{esg_hash}")
 
-        portfolio_returns = []
-        weights_history = []
+        return [self.checkpoint.key(self.schedule.train_values(k),
+                                    self.schedule.train_dates(k), settings)
+                for k in range(len(self.schedule))]
+
+    def rebalance_weights(self, mu_bl, cov_dynamic):
+        """
+        ESG-constrained weights from the posterior returns and covariance.
+        """
+        return self.optimizer.optimize(mu_bl,
+                                       cov_dynamic,
+                                       self.esg.values,
+                                       min_esg_score=self.min_esg_score)
 
-        market_weights = np.ones(len(self.returns.columns)) / len(self.returns.columns)
+    def rebalance_inputs(self):
+        """
+        Rebalance ends with the Black-Litterman posterior and dynamic
+        covariance at each of them.
+        """
+        ends = self.schedule.ends
+        n_assets = len(self.returns.columns)
 
-        for i in range(self.window, len(self.returns), self.rebalance):
+        if self.checkpoint is None:
+            self._saved = [None] * len(ends)
+        else:
+            self._keys = self.checkpoint_keys()
+            self._saved = [self.checkpoint.get(key) for key in self._keys]
+        todo = [k for k, saved in enumerate(self._saved) if saved is None]
 
-            train = self.returns.iloc[i-self.window:i]
-            test = self.returns.iloc[i:i+self.rebalance]
+        dynamic_covs = [None if saved is None else saved["cov"]
+                        for saved in self._saved]
+        mu_bls = np.array([np.full(n_assets, np.nan) if saved is None
+                           else saved["mu_bl"] for saved in self._saved])
+        mu_bls = mu_bls.reshape(len(ends), n_assets)
 
-            mu_hist = train.mean().values
+        if todo:
+            means, _, _, lw_covs = rolling_ledoit_wolf(
+                self.schedule.values, self.window, ends[todo]
+            )
 
-            risk_engine = DynamicRiskEngine(train)
-            cov_dynamic = risk_engine.dynamic_covariance().values
+            covs = window_covariances(self.schedule, self.executor, lw_covs,
+                                      self.risk_options, windows=todo)
 
-            # Black-Litterman
-            P = np.eye(len(mu_hist))  # identity views example
-            Q = mu_hist               # historical view proxy
+            # Black-Litterman for every rebalance in one batched call:
+            # identity views with the historical means as the view proxy
+            market_weights = np.ones(n_assets) / n_assets
+            mu_bls[todo] = black_litterman_posteriors(np.array(covs),
+                                                      market_weights,
+                                                      np.eye(n_assets), means)
 
-            bl = BlackLittermanDynamic(cov_dynamic, market_weights)
-            mu_bl = bl.posterior(P, Q)
+            for k, cov in zip(todo, covs):
+                dynamic_covs[k] = cov
+                if self.checkpoint is not None:
+                    self.checkpoint.put(self._keys[k], cov=cov, mu_bl=mu_bls[k])
 
-            # ESG optimization
-            optimizer = ESGOptimizer(mu_bl,
-                                     cov_dynamic,
-                                     self.esg.values)
+        return ends, mu_bls, dynamic_covs
+
+    def run(self):
+
+        ends, mu_bls, dynamic_covs = self.rebalance_inputs()
+
+        # solved in date order so each solve warm-starts from the last;
+        # checkpointed weights are reused and seed the next solve
+        weights_history = []
+        for k, (mu_bl, cov) in enumerate(zip(mu_bls, dynamic_covs)):
+
+            saved = self._saved[k]
+            if saved is not None and "weights" in saved:
+                w = saved["weights"]
+                self.optimizer.previous = w
+            else:
+                w = self.rebalance_weights(mu_bl, cov)
+                if self.checkpoint is not None:
+                    self.checkpoint.put(self._keys[k], weights=w)
 
-            w = optimizer.optimize(min_esg_score=60)
             weights_history.append(w)
 
-            test_portfolio = test @ w
-            portfolio_returns.extend(test_portfolio.values)
+        weights_history = np.array(weights_history)
+
+        # targets are held daily over each rebalance period
+        portfolio_returns, _, _ = BacktestEngine(self.schedule.values).run_schedule(
+            weights_history, ends, horizon=self.rebalance, drift=False
+        )
+
+        return portfolio_returns, weights_history
+
+    def run_threshold_sweep(self, thresholds):
+        """
+        Portfolio returns for every ESG threshold (one column each).
+        Covariances and posteriors are computed once. The thresholds are
+        split into one contiguous block per worker (a single block in
+        serial mode) and each block is solved through the executor as
+        warm-started frontier sweeps.
+        """
+        ends, mu_bls, dynamic_covs = self.rebalance_inputs()
+
+        workers = 1
+        if self.executor.mode != "serial":
+            workers = self.executor.max_workers or os.cpu_count()
+        blocks = np.array_split(np.arange(len(thresholds)), min(workers, len(thresholds)))
+
+        tasks = [(mu_bls, dynamic_covs, self.esg.values,
+                  [thresholds[k] for k in block]) for block in blocks]
+        weights = np.concatenate(self.executor.map(threshold_weights, tasks), axis=1)
+
+        engine = BacktestEngine(self.schedule.values)
+        portfolio_returns = {}
+        for k, t in enumerate(thresholds):
+            portfolio_returns[t], _, _ = engine.run_schedule(
+                weights[:, k], ends, horizon=self.rebalance, drift=False
+            )
 
-        return np.array(portfolio_returns), np.array(weights_history)
+        return pd.DataFrame(portfolio_returns, columns=thresholds)
@@ -1,63 +1,117 @@
 import numpy as np
-import pandas as pd
-from models.dynamic_risk import DynamicRiskEngine
-from models.bl_dynamic import BlackLittermanDynamic
-from models.esg_optimizer import ESGOptimizer
-from models.regime_detection import RegimeDetector
+from models.dynamic_risk import window_covariances, check_window_independent, check_checkpointable
+from models.shrinkage import rolling_ledoit_wolf
+from models.black_litterman import black_litterman_posteriors
+from models.esg_optimizer import NativeESGOptimizer
+from models.regime_detection import RegimeDetector, regime_risk_penalty
+from backtesting.backtest_engine import BacktestEngine
+from utils.executor import TaskExecutor
+from utils.walk_forward import WalkForwardScheduler
+from utils.checkpoint_store import describe_settings
 
 class RollingRegimeModel:
 
-    def __init__(self, returns, esg_scores, window=252, rebalance=21):
+    def __init__(self, returns, esg_scores, window=252, rebalance=21,
+                 risk_options=None, executor=None, checkpoint=None,
+                 regime_thresholds=None):
         self.returns = returns
         self.esg = esg_scores
         self.window = window
         self.rebalance = rebalance
-
-        self.regime_detector = RegimeDetector(returns)
+        # keyword arguments for DynamicRiskEngine, e.g. garch_backend
+        self.risk_options = risk_options or {}
+        # TaskExecutor fanning the per-rebalance covariances out over
+        # dates; see RollingFullModel
+        self.executor = executor or TaskExecutor()
+        if self.executor.mode != "serial":
+            check_window_independent(self.risk_options)
+
+        # fixed (low, high) vol thresholds; the default full-sample
+        # quantiles look ahead, see RegimeDetector
+        self.regime_detector = RegimeDetector(returns, thresholds=regime_thresholds)
+        # native active-set QP, warm-started from one rebalance to the next
+        self.optimizer = NativeESGOptimizer(len(returns.columns))
+        # optional CheckpointStore for the per-rebalance covariance and
+        # posterior means. Weights are always re-solved: the regimes are
+        # classified on the full sample, so they move as data is appended.
+        # A shared cov_filter is rejected, see RollingFullModel.
+        self.checkpoint = checkpoint
+        if checkpoint is not None:
+            check_checkpointable(self.risk_options)
+
+    def checkpoint_keys(self, schedule):
+        options = describe_settings(self.risk_options)
+        settings = f"{type(self).__name__}|{self.window}|{options}"
+
+        return [self.checkpoint.key(schedule.train_values(k),
+                                    schedule.train_dates(k), settings)
+                for k in range(len(schedule))]
 
     def run(self):
 
         regimes = self.regime_detector.classify_regime()
-        portfolio_returns = []
         weights_history = []
 
         market_weights = np.ones(len(self.returns.columns)) / len(self.returns.columns)
 
-        for i in range(self.window, len(self.returns), self.rebalance):
+        schedule = WalkForwardScheduler(self.returns, self.window, self.rebalance)
+        ends = schedule.ends
+        n_assets = len(self.returns.columns)
 
-            train = self.returns.iloc[i-self.window:i]
-            test = self.returns.iloc[i:i+self.rebalance]
-            current_regime = regimes.iloc[i]
+        if self.checkpoint is None:
+            keys, saved = None, [None] * len(ends)
+        else:
+            keys = self.checkpoint_keys(schedule)
+            saved = [self.checkpoint.get(key) for key in keys]
+        todo = [k for k, s in enumerate(saved) if s is None]
 
-            mu_hist = train.mean().values
+        dynamic_covs = [None if s is None else s["cov"] for s in saved]
+        mu_bls = np.array([np.full(n_assets, np.nan) if s is None
+                           else s["mu_bl"] for s in saved])
+        mu_bls = mu_bls.reshape(len(ends), n_assets)
 
-            risk_engine = DynamicRiskEngine(train)
-            cov_dynamic = risk_engine.dynamic_covariance().values
+        if todo:
+            means, _, _, lw_covs = rolling_ledoit_wolf(
+                schedule.values, self.window, ends[todo]
+            )
 
-            # Regime-dependent risk aversion
-            if current_regime == "High Vol":
-                risk_penalty = 1.0
-            elif current_regime == "Low Vol":
-                risk_penalty = 0.2
-            else:
-                risk_penalty = 0.5
+            covs = window_covariances(schedule, self.executor, lw_covs,
+                                      self.risk_options, windows=todo)
 
-            # Black-Litterman
-            P = np.eye(len(mu_hist))
-            Q = mu_hist
+            # Black-Litterman for every rebalance in one batched call,
+            # identity views on the historical means
+            P = np.eye(n_assets)
+            mu_bls[todo] = black_litterman_posteriors(np.array(covs),
+                                                      market_weights, P, means)
 
-            bl = BlackLittermanDynamic(cov_dynamic, market_weights)
-            mu_bl = bl.posterior(P, Q)
+            for k, cov in zip(todo, covs):
+                dynamic_covs[k] = cov
+                if self.checkpoint is not None:
+                    self.checkpoint.put(keys[k], cov=cov, mu_bl=mu_bls[k])
 
-            # ESG Optimization
-            optimizer = ESGOptimizer(mu_bl,
-                                     risk_penalty * cov_dynamic,
-                                     self.esg.values)
+        for k, i in enumerate(ends):
+
+            # regime on the last training day, known at the rebalance
+            current_regime = regimes.iloc[i - 1]
+
+            cov_dynamic = dynamic_covs[k]
+            mu_bl = mu_bls[k]
 
-            w = optimizer.optimize(min_esg_score=60)
+            # Regime-dependent risk aversion
+            risk_penalty = regime_risk_penalty(current_regime)
+
+            # ESG Optimization
+            w = self.optimizer.optimize(mu_bl,
+                                        risk_penalty * cov_dynamic,
+                                        self.esg.values,
+                                        min_esg_score=60)
             weights_history.append(w)
 
-            test_portfolio = test @ w
-            portfolio_returns.extend(test_portfolio.values)
+        weights_history = np.array(weights_history)
+
+        # targets are held daily over each rebalance period
+        portfolio_returns, _, _ = BacktestEngine(schedule.values).run_schedule(
+            weights_history, ends, horizon=self.rebalance, drift=False
+        )
 
-        return np.array(portfolio_returns), np.array(weights_history)
+        return portfolio_returns, weights_history
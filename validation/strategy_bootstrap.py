@@ -0,0 +1,123 @@
+import hashlib
+import numpy as np
+import pandas as pd
+from models.dynamic_risk import check_window_independent
+from validation.rolling_full_model import RollingFullModel
+from validation.bootstrap_validation import block_starts, stationary_indices
+from reporting.performance_report import PerformanceReport
+from utils.checkpoint_store import CheckpointStore, describe_settings
+from utils.executor import TaskExecutor
+
+class StrategyBootstrap:
+    """
+    Estimation risk of a whole rolling model: the returns history is
+    resampled (moving or stationary blocks) and the model is re-run on
+    every resampled path.
+
+    Paths run through a TaskExecutor with one seeded Generator per
+    path, derived from the executor's seed and the path number only, so
+    path p is the same series whatever the mode or worker count. Each
+    finished path is written to a CheckpointStore at once; rerunning
+    after an interruption skips the paths already on disk.
+    """
+
+    def __init__(self, returns, esg_scores, n_paths=1000, block_size=21,
+                 method="stationary", model_class=RollingFullModel,
+                 model_options=None, executor=None, store=None):
+        if method not in ("block", "stationary"):
+            raise ValueError(f"Unknown bootstrap method: {method}")
+
+        self.returns = returns
+        self.esg = esg_scores
+        self.n_paths = n_paths
+        self.block_size = block_size
+        self.method = method
+        # rolling model re-run on every path, e.g. RollingFullModel, and
+        # its keyword arguments (window, rebalance, risk_options, ...)
+        self.model_class = model_class
+        self.model_options = model_options or {}
+        # a shared cov_filter or warm-started param_cache would carry
+        # state from one path to the next, so results would depend on
+        # path order and worker scheduling
+        check_window_independent(self.model_options.get("risk_options") or {})
+
+        self.executor = executor or TaskExecutor(seed=0)
+        if self.executor.seed is None:
+            raise ValueError("StrategyBootstrap needs a seeded TaskExecutor "
+                             "so that resumed runs redraw the same paths")
+
+        self.store = store or CheckpointStore("results/strategy_bootstrap")
+
+    # -----------------------------
+    # 1. RESAMPLED PATHS
+    # -----------------------------
+    def resample(self, rng):
+        """
+        One resampled returns history, on the original dates.
+        """
+        T = len(self.returns)
+
+        if self.method == "block":
+            starts = block_starts(rng, 1, T, self.block_size)[0]
+            indices = (starts[:, None] + np.arange(self.block_size)).ravel()[:T]
+        else:
+            indices = stationary_indices(rng, 1, T, self.block_size)[0] % T
+
+        return pd.DataFrame(self.returns.values[indices],
+                            index=self.returns.index,
+                            columns=self.returns.columns)
+
+    def path_key(self, path):
+        options = describe_settings(self.model_options)
+        esg_hash = hashlib.sha1(
+            np.ascontiguousarray(self.esg.values, dtype=float).tobytes()
+        ).hexdigest()
+        settings = (f"{self.model_class.__name__}|{options}|{esg_hash}|"
+                    f"{self.method}|{self.block_size}|{self.executor.seed}|{path}")
+
+        return self.store.key(self.returns.values, self.returns.index, settings)
+
+    def run_path(self, path, rng):
+        """
+        Re-run the model on resampled path ``path`` and save its daily
+        returns, weights and performance summary. Called on the workers
+        as a bound method, so paths stream to disk as they finish.
+        """
+        key = self.path_key(path)
+        if self.store.get(key) is not None:
+            return path
+
+        model = self.model_class(self.resample(rng), self.esg, **self.model_options)
+        portfolio_returns, weights = model.run()
+
+        summary = PerformanceReport(portfolio_returns).summary()
+        self.store.put(key,
+                       returns=np.asarray(portfolio_returns, dtype=float),
+                       weights=weights,
+                       summary=np.array(list(summary.values())),
+                       metrics=np.array(list(summary.keys())))
+        return path
+
+    # -----------------------------
+    # 2. RESULT SET
+    # -----------------------------
+    def run(self):
+        """
+        Run every path not yet on disk, then return the result set.
+        """
+        # every path is submitted so each keeps its seed; finished
+        # ones return straight away
+        self.executor.map(self.run_path, range(self.n_paths), seeded=True)
+        return self.results()
+
+    def results(self):
+        """
+        Performance summary of every finished path, one row each.
+        """
+        rows = {}
+        for path in range(self.n_paths):
+            saved = self.store.get(self.path_key(path))
+            if saved is not None:
+                rows[path] = pd.Series(saved["summary"], index=saved["metrics"])
+
+        return pd.DataFrame.from_dict(rows, orient="index")